@@ -0,0 +1,82 @@
+"""
+asynckite.py — Minimal asyncio Kite Connect client over aiohttp
+Covers the endpoints the order path needs: place/cancel order, orderbook, quote
+"""
+import aiohttp
+import orjson
+from kiteconnect import KiteConnect, exceptions as kite_ex
+
+KITE_ROOT = "https://api.kite.trade"
+
+# Idle pooled connections are kept this long; OrderManager pings more often than this
+KEEPALIVE_TIMEOUT = 120.0
+
+class AsyncKite:
+    """
+    Same method names and constants as KiteConnect for the calls it covers,
+    but every call is a coroutine on one pooled keep-alive aiohttp session.
+    """
+    VARIETY_REGULAR        = KiteConnect.VARIETY_REGULAR
+    EXCHANGE_NFO           = KiteConnect.EXCHANGE_NFO
+    TRANSACTION_TYPE_BUY   = KiteConnect.TRANSACTION_TYPE_BUY
+    TRANSACTION_TYPE_SELL  = KiteConnect.TRANSACTION_TYPE_SELL
+    ORDER_TYPE_LIMIT       = KiteConnect.ORDER_TYPE_LIMIT
+    ORDER_TYPE_MARKET      = KiteConnect.ORDER_TYPE_MARKET
+    PRODUCT_MIS            = KiteConnect.PRODUCT_MIS
+
+    def __init__(self, api_key: str, access_token: str):
+        self.api_key      = api_key
+        self.access_token = access_token
+        self._session: aiohttp.ClientSession | None = None
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        # Created lazily: aiohttp sessions must be built inside the running loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                base_url=KITE_ROOT,
+                connector=aiohttp.TCPConnector(
+                    limit=16,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=KEEPALIVE_TIMEOUT,
+                    enable_cleanup_closed=True,
+                ),
+                headers={
+                    "X-Kite-Version": "3",
+                    "Authorization":  f"token {self.api_key}:{self.access_token}",
+                },
+                timeout=aiohttp.ClientTimeout(total=7),
+            )
+        return self._session
+
+    async def _request(self, method: str, path: str, params=None, data=None):
+        session = self._ensure_session()
+        async with session.request(method, path, params=params, data=data) as resp:
+            if "json" in resp.content_type:
+                body = await resp.json(loads=orjson.loads)
+                if resp.status >= 400 or body.get("status") == "error":
+                    exc = getattr(kite_ex, body.get("error_type") or "", kite_ex.GeneralException)
+                    raise exc(body.get("message", resp.reason), code=resp.status)
+                return body["data"]
+            raise kite_ex.DataException(
+                f"Unknown content type ({resp.content_type}) from {path}", code=resp.status)
+
+    async def warmup(self):
+        """Cheap authenticated call that opens (or keeps open) the pooled TLS connection"""
+        await self._request("GET", "/user/margins")
+
+    async def place_order(self, variety: str, **params) -> str:
+        data = {k: v for k, v in params.items() if v is not None}
+        return (await self._request("POST", f"/orders/{variety}", data=data))["order_id"]
+
+    async def cancel_order(self, variety: str, order_id: str) -> str:
+        return (await self._request("DELETE", f"/orders/{variety}/{order_id}"))["order_id"]
+
+    async def orders(self) -> list[dict]:
+        return await self._request("GET", "/orders")
+
+    async def quote(self, instruments: list[str]) -> dict:
+        return await self._request("GET", "/quote", params=[("i", i) for i in instruments])
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -2,8 +2,10 @@
 auth.py — Automated Zerodha login using Playwright headless browser
 Runs daily at 08:30 IST, refreshes access_token automatically
 """
-import os, json, asyncio, logging, datetime
+import os, json, fcntl, random, asyncio, logging, datetime
+from contextlib import contextmanager
 from pathlib import Path
+from urllib.parse import urlparse, parse_qs
 from kiteconnect import KiteConnect
 
 log = logging.getLogger("GEKKO.auth")
@@ -18,21 +20,45 @@ CREDENTIALS = {
 
 TOKEN_FILE = Path("/tmp/gekko_token.json")
 
+# Login retry backoff: full jitter, sleep ~ U(0, min(cap, base * 2**(attempt-1)))
+LOGIN_RETRY_BASE = 15.0
+LOGIN_RETRY_CAP  = 600.0
+
+# Zerodha's login page is text + form: skip GPU, extensions, background traffic and images
+LOGIN_BROWSER_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--blink-settings=imagesEnabled=false",
+]
+TOKEN_LOCK = TOKEN_FILE.with_suffix(".lock")
+
+@contextmanager
+def _token_lock(mode: int):
+    """flock on a sidecar file: LOCK_EX for writers, LOCK_SH for readers of TOKEN_FILE"""
+    with open(TOKEN_LOCK, "a") as fd:
+        fcntl.flock(fd, mode)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
 class ZerodhaAuth:
     def __init__(self, state):
         self.state = state
-        self.kite = None
+        # One client for every auth path so its HTTPS session (and pool) is reused
+        self.kite = KiteConnect(api_key=CREDENTIALS["api_key"])
 
     def get_login_url(self) -> str:
         """Manual fallback: returns Zerodha login URL"""
-        kite = KiteConnect(api_key=CREDENTIALS["api_key"])
-        return kite.login_url()
+        return self.kite.login_url()
 
     async def exchange_token(self, request_token: str):
         """Manual fallback: exchange request_token for access_token"""
-        kite = KiteConnect(api_key=CREDENTIALS["api_key"])
-        data = kite.generate_session(request_token, api_secret=CREDENTIALS["api_secret"])
-        self._save_and_apply(kite, data["access_token"])
+        data = self.kite.generate_session(request_token, api_secret=CREDENTIALS["api_secret"])
+        self._save_and_apply(self.kite, data["access_token"])
         self.state.auth_status = "connected"
         self.state.add_log("GEKKO", "Zerodha connected via manual login ✓", "info")
         log.info("Manual token exchange successful")
@@ -43,11 +69,16 @@ class ZerodhaAuth:
         self.state.kite = kite
         self.state.auth_status = "connected"
         self.state.token_expires = (datetime.datetime.now() + datetime.timedelta(hours=16)).isoformat()
-        # Save for restarts
-        TOKEN_FILE.write_text(json.dumps({
+        # Save for restarts — write a temp file and rename over, so a reader
+        # never sees truncated JSON
+        payload = json.dumps({
             "access_token": access_token,
             "date": datetime.date.today().isoformat()
-        }))
+        })
+        tmp = TOKEN_FILE.with_suffix(".json.tmp")
+        with _token_lock(fcntl.LOCK_EX):
+            tmp.write_text(payload)
+            os.replace(tmp, TOKEN_FILE)
         log.info(f"Zerodha connected. Token saved.")
 
     def _try_load_saved_token(self) -> bool:
@@ -55,11 +86,12 @@ class ZerodhaAuth:
         if not TOKEN_FILE.exists():
             return False
         try:
-            data = json.loads(TOKEN_FILE.read_text())
+            # Shared lock released before _save_and_apply takes the exclusive one
+            with _token_lock(fcntl.LOCK_SH):
+                data = json.loads(TOKEN_FILE.read_text())
             if data["date"] != datetime.date.today().isoformat():
                 return False
-            kite = KiteConnect(api_key=CREDENTIALS["api_key"])
-            self._save_and_apply(kite, data["access_token"])
+            self._save_and_apply(self.kite, data["access_token"])
             log.info("Reused saved token from today")
             return True
         except Exception as e:
@@ -112,7 +144,10 @@ class ZerodhaAuth:
                 log.error(f"Auto-login attempt {attempt} failed: {e}")
                 self.state.add_log("GEKKO", f"Login attempt {attempt} failed: {e}", "alert")
                 if attempt < retry:
-                    await asyncio.sleep(30 * attempt)  # backoff: 30s, 60s
+                    # Jittered so instances logging in together at 08:30 don't retry in lockstep
+                    delay = random.uniform(0, min(LOGIN_RETRY_CAP,
+                                                  LOGIN_RETRY_BASE * 2 ** (attempt - 1)))
+                    await asyncio.sleep(delay)
 
         self.state.add_log("GEKKO",
             "Auto-login failed after 3 attempts. Visit /login to authenticate manually.", "alert")
@@ -132,19 +167,44 @@ class ZerodhaAuth:
         if not all([api_key, api_secret, user_id, password, totp_secret]):
             raise ValueError("Missing Zerodha credentials in environment variables")
 
-        kite = KiteConnect(api_key=api_key)
+        kite = self.kite
         login_url = kite.login_url()
 
         async with async_playwright() as p:
+            # CHROME_HEADLESS_SHELL points at a chrome-headless-shell binary
+            # (much smaller and faster to start); default is Playwright's Chromium
             browser = await p.chromium.launch(
                 headless=True,
-                args=["--no-sandbox", "--disable-dev-shm-usage"]
+                executable_path=os.getenv("CHROME_HEADLESS_SHELL") or None,
+                args=LOGIN_BROWSER_ARGS,
             )
             context = await browser.new_context(
                 user_agent="Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15"
             )
             page = await context.new_page()
 
+            # Zerodha redirects to: https://your-redirect-url?request_token=XXX&status=success
+            # The token is read off the redirect request itself (so it works even if
+            # the redirect target is unreachable) and wakes the waiter in Step 4.
+            redirect_url = os.getenv("ZERODHA_REDIRECT_URL", "https://127.0.0.1")
+            self._pending_request_token = None
+            self._token_event = asyncio.Event()
+
+            # Plain function, not a coroutine: the emitter would otherwise wrap
+            # every one of the page's requests in a Task just to reject its URL
+            def capture_token(request):
+                url = request.url
+                if "request_token=" not in url:
+                    return
+                params = parse_qs(urlparse(url).query)
+                tokens = params.get("request_token", [])
+                if tokens:
+                    self._pending_request_token = tokens[0]
+                    log.info(f"Captured request_token: {tokens[0][:10]}...")
+                    self._token_event.set()
+
+            page.on("request", capture_token)
+
             # ── Step 1: Navigate to login ──
             log.info(f"Navigating to Zerodha login...")
             await page.goto(login_url, wait_until="networkidle")
@@ -166,34 +226,17 @@ class ZerodhaAuth:
                 await page.locator('button[type="submit"]:not([disabled])').click(timeout=3000)
             except Exception:
                 pass  # button already processing, that's fine
-            await page.wait_for_timeout(5000)  # wait for Zerodha to redirect
 
             # ── Step 4: Wait for redirect and capture request_token ──
-            # Zerodha redirects to: https://your-redirect-url?request_token=XXX&status=success
-            redirect_url = os.getenv("ZERODHA_REDIRECT_URL", "https://127.0.0.1")
-
-            async def capture_token(response):
-                url = response.url
-                if "request_token=" in url:
-                    from urllib.parse import urlparse, parse_qs
-                    params = parse_qs(urlparse(url).query)
-                    tokens = params.get("request_token", [])
-                    if tokens:
-                        self._pending_request_token = tokens[0]
-                        log.info(f"Captured request_token: {tokens[0][:10]}...")
-
-            self._pending_request_token = None
-
-            # Wait for Zerodha to redirect back with request_token
+            # Resumes as soon as capture_token sees the redirect
             try:
-                await page.wait_for_url("**/callback*", timeout=30000)
-            except Exception:
+                await asyncio.wait_for(self._token_event.wait(), timeout=30)
+            except asyncio.TimeoutError:
                 # Also check current URL directly
                 pass
 
             current_url = page.url
-            if "request_token=" in current_url:
-                from urllib.parse import urlparse, parse_qs
+            if not self._pending_request_token and "request_token=" in current_url:
                 params = parse_qs(urlparse(current_url).query)
                 self._pending_request_token = params.get("request_token", [None])[0]
 
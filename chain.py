@@ -0,0 +1,103 @@
+"""
+chain.py — Column (SoA) view of the option chain for strategy candidate selection
+Kernels are Numba-compiled when numba is installed, NumPy otherwise
+"""
+from dataclasses import dataclass, field
+import numpy as np
+
+try:
+    import numba
+except ImportError:     # optional accelerator — NumPy path is used without it
+    numba = None
+
+@dataclass
+class ChainSoA:
+    """
+    One NumPy column per field the strategies filter on, row-aligned with
+    the option dicts in state.option_chain. Built by AgentState.set_option_chain,
+    kept current by MarketFeed.flush_greeks.
+    """
+    symbol:      np.ndarray     # object array of tradingsymbols
+    strike:      np.ndarray
+    is_ce:       np.ndarray
+    ltp:         np.ndarray
+    oi:          np.ndarray
+    iv:          np.ndarray
+    delta:       np.ndarray
+    iv_mismatch: np.ndarray
+    row: dict[int, int] = field(default_factory=dict)   # instrument_token -> row
+
+    @classmethod
+    def from_options(cls, opts: list[dict]) -> "ChainSoA":
+        col = lambda k: np.array([o.get(k, 0.0) for o in opts], dtype=float)
+        return cls(
+            symbol      = np.array([o["symbol"] for o in opts], dtype=object),
+            strike      = col("strike"),
+            is_ce       = np.array([o["type"] == "CE" for o in opts], dtype=bool),
+            ltp         = col("ltp"),
+            oi          = col("oi"),
+            iv          = col("iv"),
+            delta       = col("delta"),
+            iv_mismatch = col("iv_mismatch"),
+            row         = {o["token"]: i for i, o in enumerate(opts) if o.get("token") is not None},
+        )
+
+    def refresh(self, opts: list[dict]):
+        """Copy ticked/repriced option dicts back into their rows"""
+        for opt in opts:
+            i = self.row.get(opt.get("token"))
+            if i is None:
+                continue
+            self.ltp[i]         = opt.get("ltp", 0.0)
+            self.oi[i]          = opt.get("oi", 0.0)
+            self.iv[i]          = opt.get("iv", 0.0)
+            self.delta[i]       = opt.get("delta", 0.0)
+            self.iv_mismatch[i] = opt.get("iv_mismatch", 0.0)
+
+
+# ── Candidate kernels ─────────────────────────────────────────
+# Both return row indices (-1 when nothing qualifies); ties go to the lowest row.
+
+if numba is not None:
+    _jit = numba.njit(cache=True)
+
+    @_jit
+    def find_most_overpriced(iv_mismatch, oi, threshold, min_oi):
+        """Row with the highest iv_mismatch >= threshold and oi > min_oi"""
+        best = -1
+        for i in range(iv_mismatch.shape[0]):
+            if iv_mismatch[i] >= threshold and oi[i] > min_oi:
+                if best < 0 or iv_mismatch[i] > iv_mismatch[best]:
+                    best = i
+        return best
+
+    @_jit
+    def find_condor_shorts(delta, is_ce, iv_mismatch, dmin, dmax):
+        """(CE row, PE row) with the highest iv_mismatch and dmin <= |delta| <= dmax"""
+        ce = -1
+        pe = -1
+        for i in range(delta.shape[0]):
+            d = abs(delta[i])
+            if d < dmin or d > dmax:
+                continue
+            if is_ce[i]:
+                if ce < 0 or iv_mismatch[i] > iv_mismatch[ce]:
+                    ce = i
+            elif pe < 0 or iv_mismatch[i] > iv_mismatch[pe]:
+                pe = i
+        return ce, pe
+
+else:
+    def _argmax_where(mask, values) -> int:
+        return int(np.argmax(np.where(mask, values, -np.inf))) if mask.any() else -1
+
+    def find_most_overpriced(iv_mismatch, oi, threshold, min_oi):
+        """Row with the highest iv_mismatch >= threshold and oi > min_oi"""
+        return _argmax_where((iv_mismatch >= threshold) & (oi > min_oi), iv_mismatch)
+
+    def find_condor_shorts(delta, is_ce, iv_mismatch, dmin, dmax):
+        """(CE row, PE row) with the highest iv_mismatch and dmin <= |delta| <= dmax"""
+        d    = np.abs(delta)
+        band = (d >= dmin) & (d <= dmax)
+        return (_argmax_where(band & is_ce, iv_mismatch),
+                _argmax_where(band & ~is_ce, iv_mismatch))
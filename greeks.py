@@ -1,81 +1,341 @@
 """
 greeks.py — Black-Scholes Greeks engine
-IV via Newton-Raphson, full Greeks: delta, gamma, theta, vega
+IV via Jäckel's normalised-price Householder iteration, full Greeks: delta, gamma, theta, vega
+full_greeks_vec solves a whole option chain in one vectorised pass (Numba-compiled if available)
 """
+import datetime, functools, math, time
+from typing import NamedTuple
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr, ndtri
+
+try:
+    import numba
+except ImportError:     # optional accelerator — NumPy path is used without it
+    numba = None
+
+_INV_SQRT_2PI = 1.0 / np.sqrt(2 * np.pi)
+
+@functools.lru_cache(maxsize=4)
+def _ttm_for(expiry_str: str, minute_bucket: int) -> float:
+    try:
+        exp = datetime.datetime.strptime(expiry_str, "%d%b%y")
+        now = datetime.datetime.now()
+        return max((exp - now).total_seconds() / (365.25 * 24 * 3600), 1/365)
+    except Exception:
+        return 7/365  # default 1 week
+
+def time_to_expiry(expiry_str: str) -> float:
+    """Years to a "%d%b%y" expiry, computed once per expiry per minute"""
+    return _ttm_for(expiry_str, int(time.time() // 60))
+
+def _npdf(x):
+    """Standard normal pdf without the scipy.stats dispatch overhead"""
+    return np.exp(-0.5 * x * x) * _INV_SQRT_2PI
+
+def _normalised_call(x, s):
+    """Black call price / sqrt(F*K) as a function of x = ln(F/K) and s = sigma*sqrt(T)"""
+    return np.exp(0.5 * x) * ndtr(x / s + 0.5 * s) - np.exp(-0.5 * x) * ndtr(x / s - 0.5 * s)
+
+class _BSCore(NamedTuple):
+    """Shared sub-expressions of one Black-Scholes evaluation"""
+    d1:    object
+    d2:    object
+    nd1:   object      # N(theta*d1), theta = +1 call / -1 put
+    nd2:   object      # N(theta*d2)
+    pdf1:  object      # n(d1)
+    disc:  object      # K*exp(-rT)
+    sqrtT: object
+    theta: object      # +1 call / -1 put
 
 class BSGreeks:
+    @staticmethod
+    def _bs_core(S, K, T, r, sigma, opt_type="CE") -> _BSCore:
+        """
+        Compute d1/d2 and their normal cdf/pdf once; every Greek reads from this.
+        opt_type is "CE"/"PE", or a boolean is-call array for chain-wide evaluation.
+        """
+        if isinstance(opt_type, str):
+            theta = 1.0 if opt_type == "CE" else -1.0
+        else:
+            theta = np.where(opt_type, 1.0, -1.0)
+        sqrtT = np.sqrt(T)
+        sd    = sigma * sqrtT
+        d1    = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / sd
+        d2    = d1 - sd
+        return _BSCore(d1, d2, ndtr(theta * d1), ndtr(theta * d2), _npdf(d1),
+                       K * np.exp(-r * T), sqrtT, theta)
+
     @staticmethod
     def d1(S, K, T, r, sigma):
-        return (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+        return BSGreeks._bs_core(S, K, T, r, sigma).d1
 
     @staticmethod
     def d2(S, K, T, r, sigma):
-        return BSGreeks.d1(S, K, T, r, sigma) - sigma * np.sqrt(T)
+        return BSGreeks._bs_core(S, K, T, r, sigma).d2
+
+    @staticmethod
+    def _price(S, c: _BSCore):
+        return c.theta * (S * c.nd1 - c.disc * c.nd2)
+
+    @staticmethod
+    def _delta(c: _BSCore):
+        return c.theta * c.nd1
+
+    @staticmethod
+    def _gamma(S, sigma, c: _BSCore):
+        return c.pdf1 / (S * sigma * c.sqrtT)
+
+    @staticmethod
+    def _theta(S, r, sigma, c: _BSCore):
+        t1 = -(S * c.pdf1 * sigma) / (2 * c.sqrtT)
+        return (t1 - c.theta * r * c.disc * c.nd2) / 365
+
+    @staticmethod
+    def _vega(S, c: _BSCore):
+        return S * c.pdf1 * c.sqrtT / 100
 
     @classmethod
     def price(cls, S, K, T, r, sigma, opt_type="CE"):
-        d1, d2 = cls.d1(S,K,T,r,sigma), cls.d2(S,K,T,r,sigma)
-        if opt_type == "CE":
-            return S * norm.cdf(d1) - K * np.exp(-r*T) * norm.cdf(d2)
-        return K * np.exp(-r*T) * norm.cdf(-d2) - S * norm.cdf(-d1)
+        return cls._price(S, cls._bs_core(S, K, T, r, sigma, opt_type))
 
     @classmethod
     def delta(cls, S, K, T, r, sigma, opt_type="CE"):
-        d1 = cls.d1(S,K,T,r,sigma)
-        return norm.cdf(d1) if opt_type == "CE" else norm.cdf(d1) - 1
+        return cls._delta(cls._bs_core(S, K, T, r, sigma, opt_type))
 
     @classmethod
     def gamma(cls, S, K, T, r, sigma):
-        d1 = cls.d1(S,K,T,r,sigma)
-        return norm.pdf(d1) / (S * sigma * np.sqrt(T))
+        return cls._gamma(S, sigma, cls._bs_core(S, K, T, r, sigma))
 
     @classmethod
     def theta(cls, S, K, T, r, sigma, opt_type="CE"):
-        d1, d2 = cls.d1(S,K,T,r,sigma), cls.d2(S,K,T,r,sigma)
-        t1 = -(S * norm.pdf(d1) * sigma) / (2 * np.sqrt(T))
-        if opt_type == "CE":
-            return (t1 - r * K * np.exp(-r*T) * norm.cdf(d2)) / 365
-        return (t1 + r * K * np.exp(-r*T) * norm.cdf(-d2)) / 365
+        return cls._theta(S, r, sigma, cls._bs_core(S, K, T, r, sigma, opt_type))
 
     @classmethod
     def vega(cls, S, K, T, r, sigma):
-        d1 = cls.d1(S,K,T,r,sigma)
-        return S * norm.pdf(d1) * np.sqrt(T) / 100
+        return cls._vega(S, cls._bs_core(S, K, T, r, sigma))
 
     @classmethod
     def implied_volatility(cls, market_price, S, K, T, r, opt_type="CE",
-                           tol=1e-5, max_iter=200) -> float:
-        """Newton-Raphson IV solver"""
-        if market_price <= 0:
-            return 0.0
-        sigma = 0.20  # initial guess
+                           tol=1e-5, max_iter=8) -> float:
+        """Scalar IV — see implied_volatility_vec"""
+        iv = cls.implied_volatility_vec([market_price], S, [K], [T], r, [opt_type == "CE"],
+                                        tol, max_iter)
+        return float(iv[0])
+
+    @staticmethod
+    def implied_volatility_vec(price_arr, S, K_arr, T_arr, r, is_call_arr,
+                               tol=1e-5, max_iter=8) -> np.ndarray:
+        """
+        Jäckel ("By Implication") IV solver over arrays.
+        Each option is mapped to an out-of-the-money call in normalised
+        coordinates x = ln(F/K) <= 0, b = undiscounted price / sqrt(F*K), and
+        s = sigma*sqrt(T) is found with third-order Householder steps from the
+        inflection point sqrt(2|x|) (or the ATM inversion when that is higher).
+        An option stops once a step moves its price by less than tol (vega*|ds|):
+        the step is third-order, so the price is never re-evaluated just to
+        confirm convergence. Typically 2-4 steps. Returns 0 where the price
+        has no solution.
+        """
+        K      = np.asarray(K_arr, dtype=float)
+        T      = np.asarray(T_arr, dtype=float)
+        mkt    = np.asarray(price_arr, dtype=float)
+        theta  = np.where(np.asarray(is_call_arr, dtype=bool), 1.0, -1.0)
+        growth = np.exp(r * T)
+        F      = S * growth
+        x      = np.log(F / K)
+        scale  = np.sqrt(F * K)
+        beta   = mkt * growth / scale
+        tol_b  = tol * growth / scale
+
+        # Strip intrinsic: an ITM option is the OTM option of the other type
+        intrinsic = np.maximum(theta * (np.exp(0.5 * x) - np.exp(-0.5 * x)), 0.0)
+        beta  = beta - intrinsic
+        theta = np.where(intrinsic > 0, -theta, theta)
+        # OTM put at x is the OTM call at -x
+        x     = np.minimum(np.where(theta < 0, -x, x), 0.0)
+
+        # Price must lie strictly between intrinsic and the zero-strike bound
+        solvable = (beta > 0) & (beta < np.exp(0.5 * x))
+        beta     = np.where(solvable, beta, 0.5 * np.exp(0.5 * x))
+
+        s_c = np.sqrt(-2.0 * x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            b_c = np.where(s_c > 0, _normalised_call(x, s_c), 0.0)
+        s_atm = 2.0 * ndtri(0.5 * (1.0 + beta))
+        s = np.where(beta >= b_c, np.maximum(s_c, s_atm), s_c)
+
+        active = np.flatnonzero(solvable)
         for _ in range(max_iter):
-            try:
-                p    = cls.price(S, K, T, r, sigma, opt_type)
-                vega = cls.vega(S, K, T, r, sigma) * 100  # unscale
-                if abs(vega) < 1e-10:
-                    break
-                sigma -= (p - market_price) / vega
-                sigma  = max(0.001, min(sigma, 5.0))
-                if abs(cls.price(S, K, T, r, sigma, opt_type) - market_price) < tol:
-                    break
-            except Exception:
+            if active.size == 0:
                 break
-        return sigma
+            xa, sa = x[active], s[active]
+            resid  = _normalised_call(xa, sa) - beta[active]
+            moving = np.abs(resid) >= tol_b[active]
+            active, xa, sa, resid = active[moving], xa[moving], sa[moving], resid[moving]
+            # Vega b' and the ratios b''/b', b'''/b' are closed-form in (x, s)
+            b1 = _INV_SQRT_2PI * np.exp(-0.5 * (xa * xa / (sa * sa) + 0.25 * sa * sa))
+            h2 = xa * xa / sa**3 - 0.25 * sa
+            h3 = h2 * h2 - 3.0 * xa * xa / sa**4 - 0.25
+            nu = -resid / b1
+            s_new = sa + nu * (1.0 + 0.5 * h2 * nu) / (1.0 + nu * (h2 + h3 * nu / 6.0))
+            s_new = np.where(s_new > 0, s_new, 0.5 * sa)
+            s[active] = s_new
+            active = active[b1 * np.abs(s_new - sa) >= tol_b[active]]
+
+        return np.where(solvable, s / np.sqrt(T), 0.0)
 
     @classmethod
     def full_greeks(cls, S, K, T, r, market_price, opt_type="CE") -> dict:
         """Compute all Greeks from market price"""
-        iv = cls.implied_volatility(market_price, S, K, T, r, opt_type)
-        if iv <= 0:
-            return {"iv": 0, "delta": 0, "gamma": 0, "theta": 0, "vega": 0, "fair_price": 0}
-        return {
-            "iv":         round(iv * 100, 2),          # as percentage
-            "delta":      round(cls.delta(S,K,T,r,iv,opt_type), 4),
-            "gamma":      round(cls.gamma(S,K,T,r,iv), 5),
-            "theta":      round(cls.theta(S,K,T,r,iv,opt_type), 2),
-            "vega":       round(cls.vega(S,K,T,r,iv), 4),
-            "fair_price": round(cls.price(S,K,T,r,iv,opt_type), 2),
-        }
+        g = cls.full_greeks_vec(S, [K], [T], r, [market_price], [opt_type == "CE"])
+        return {k: v[0] for k, v in g.items()}
+
+    @classmethod
+    def full_greeks_vec(cls, S, K_arr, T_arr, r, price_arr, is_call_arr,
+                        tol=1e-5, max_iter=8) -> dict:
+        """
+        Vectorised full_greeks over a chain: IV for every strike is solved
+        simultaneously, then all Greeks come out of one array pass.
+        Uses the Numba kernel when numba is installed.
+        Returns {"iv": [...], "delta": [...], ...} as lists of full-precision
+        floats — rounding is left to serialisation.
+        """
+        K       = np.ascontiguousarray(K_arr, dtype=float)
+        T       = np.ascontiguousarray(T_arr, dtype=float)
+        mkt     = np.ascontiguousarray(price_arr, dtype=float)
+        is_call = np.ascontiguousarray(is_call_arr, dtype=bool)
+        if numba is not None:
+            out = np.empty((len(_GREEK_KEYS), K.size))
+            _greeks_chain_nb(float(S), K, T, float(r), mkt, is_call, tol, max_iter, out)
+        else:
+            out = cls._greeks_chain_np(S, K, T, r, mkt, is_call, tol, max_iter)
+        return dict(zip(_GREEK_KEYS, out.tolist()))
+
+    @classmethod
+    def _greeks_chain_np(cls, S, K, T, r, mkt, is_call, tol, max_iter) -> np.ndarray:
+        """NumPy path of full_greeks_vec: rows in _GREEK_KEYS order, zeros where IV has no solution"""
+        sigma = cls.implied_volatility_vec(mkt, S, K, T, r, is_call, tol, max_iter)
+        # Greeks at the solved vol, all from one core evaluation
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c   = cls._bs_core(S, K, T, r, sigma, is_call)
+            out = np.vstack([
+                sigma * 100,                          # as percentage
+                cls._delta(c),
+                cls._gamma(S, sigma, c),
+                cls._theta(S, r, sigma, c),
+                cls._vega(S, c),
+                cls._price(S, c),
+            ])
+        return np.where(sigma > 0, out, 0.0)
+
+
+# ── Numba kernels ─────────────────────────────────────────────
+# Scalar mirrors of implied_volatility_vec / _bs_core, compiled when numba
+# is available. Without numba they stay plain Python and are never called.
+_GREEK_KEYS = ("iv", "delta", "gamma", "theta", "vega", "fair_price")
+
+# No fastmath: reassociating/contracting the intrinsic and solvability arithmetic
+# changes which near-intrinsic prices are solvable, so results would differ by path
+_jit = numba.njit(cache=True) if numba is not None else (lambda f: f)
+
+_SQRT1_2 = math.sqrt(0.5)
+_INV_SQRT_2PI_F = 1.0 / math.sqrt(2.0 * math.pi)
+
+# Acklam's rational approximation to the inverse normal cdf (rel. error < 1.2e-9)
+_ACK_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+          1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_ACK_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+          6.680131188771972e+01, -1.328068155288572e+01)
+_ACK_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+          -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_ACK_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+          3.754408661907416e+00)
+
+@_jit
+def _ncdf_nb(x):
+    return 0.5 * math.erfc(-x * _SQRT1_2)
+
+@_jit
+def _ndtri_upper_nb(p):
+    """Inverse normal cdf for p in [0.5, 1)"""
+    a, b, c, d = _ACK_A, _ACK_B, _ACK_C, _ACK_D
+    if p <= 0.97575:
+        q = p - 0.5
+        t = q * q
+        return ((((((a[0]*t + a[1])*t + a[2])*t + a[3])*t + a[4])*t + a[5]) * q /
+                (((((b[0]*t + b[1])*t + b[2])*t + b[3])*t + b[4])*t + 1.0))
+    q = math.sqrt(-2.0 * math.log(1.0 - p))
+    return -((((((c[0]*q + c[1])*q + c[2])*q + c[3])*q + c[4])*q + c[5]) /
+             ((((d[0]*q + d[1])*q + d[2])*q + d[3])*q + 1.0))
+
+@_jit
+def _normalised_call_nb(x, s):
+    return (math.exp(0.5 * x) * _ncdf_nb(x / s + 0.5 * s)
+            - math.exp(-0.5 * x) * _ncdf_nb(x / s - 0.5 * s))
+
+@_jit
+def _iv_nb(price, S, K, T, r, is_call, tol, max_iter):
+    """Scalar implied_volatility_vec"""
+    if price <= 0.0 or T <= 0.0:
+        return 0.0
+    growth = math.exp(r * T)
+    F      = S * growth
+    x      = math.log(F / K)
+    scale  = math.sqrt(F * K)
+    beta   = price * growth / scale
+    tol_b  = tol * growth / scale
+    theta  = 1.0 if is_call else -1.0
+    intrinsic = max(theta * (math.exp(0.5 * x) - math.exp(-0.5 * x)), 0.0)
+    if intrinsic > 0.0:
+        beta -= intrinsic
+        theta = -theta
+    if theta < 0.0:
+        x = -x
+    x = min(x, 0.0)
+    if beta <= 0.0 or beta >= math.exp(0.5 * x):
+        return 0.0
+
+    s_c = math.sqrt(-2.0 * x)
+    s   = s_c
+    b_c = _normalised_call_nb(x, s_c) if s_c > 0.0 else 0.0
+    if beta >= b_c:
+        s = max(s_c, 2.0 * _ndtri_upper_nb(0.5 * (1.0 + beta)))
+    for _ in range(max_iter):
+        resid = _normalised_call_nb(x, s) - beta
+        if abs(resid) < tol_b:
+            break
+        b1 = _INV_SQRT_2PI_F * math.exp(-0.5 * (x * x / (s * s) + 0.25 * s * s))
+        h2 = x * x / (s * s * s) - 0.25 * s
+        h3 = h2 * h2 - 3.0 * x * x / (s * s * s * s) - 0.25
+        nu = -resid / b1
+        s_new = s + nu * (1.0 + 0.5 * h2 * nu) / (1.0 + nu * (h2 + h3 * nu / 6.0))
+        s_new = s_new if s_new > 0.0 else 0.5 * s
+        if b1 * abs(s_new - s) < tol_b:
+            return s_new / math.sqrt(T)
+        s = s_new
+    return s / math.sqrt(T)
+
+@_jit
+def _greeks_chain_nb(S, K, T, r, price, is_call, tol, max_iter, out):
+    """Fill out[6, n] with iv%, delta, gamma, theta, vega, fair_price per option"""
+    for i in range(K.shape[0]):
+        sigma = _iv_nb(price[i], S, K[i], T[i], r, is_call[i], tol, max_iter)
+        if sigma <= 0.0:
+            for j in range(6):
+                out[j, i] = 0.0
+            continue
+        theta = 1.0 if is_call[i] else -1.0
+        sqrtT = math.sqrt(T[i])
+        sd    = sigma * sqrtT
+        d1    = (math.log(S / K[i]) + (r + 0.5 * sigma * sigma) * T[i]) / sd
+        d2    = d1 - sd
+        nd1   = _ncdf_nb(theta * d1)
+        nd2   = _ncdf_nb(theta * d2)
+        pdf1  = _INV_SQRT_2PI_F * math.exp(-0.5 * d1 * d1)
+        disc  = K[i] * math.exp(-r * T[i])
+        out[0, i] = sigma * 100.0
+        out[1, i] = theta * nd1
+        out[2, i] = pdf1 / (S * sd)
+        out[3, i] = (-(S * pdf1 * sigma) / (2.0 * sqrtT) - theta * r * disc * nd2) / 365.0
+        out[4, i] = S * pdf1 * sqrtT / 100.0
+        out[5, i] = theta * (S * nd1 - disc * nd2)
@@ -2,18 +2,19 @@
 GEKKO Backend — FastAPI + WebSocket + Zerodha KiteConnect
 Handles: auto-login, live prices, order placement, strategy execution
 """
-import os, json, asyncio, logging, datetime
+import os, json, time, asyncio, logging, datetime
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, RedirectResponse
 import uvicorn
+import orjson
 
 from auth import ZerodhaAuth
 from market import MarketFeed
 from strategies import StrategyA, StrategyB
 from orders import OrderManager
-from state import AgentState
+from state import AgentState, rounded_option
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [GEKKO] %(message)s")
 log = logging.getLogger("GEKKO")
@@ -21,8 +22,8 @@ log = logging.getLogger("GEKKO")
 # ── Shared state ──────────────────────────────────────────────
 state = AgentState()
 auth  = ZerodhaAuth(state)
-feed  = MarketFeed(state)
 order_mgr = OrderManager(state)
+feed  = MarketFeed(state, on_order_update=order_mgr.on_order_update)
 strat_a   = StrategyA(state, order_mgr)
 strat_b   = StrategyB(state, order_mgr)
 
@@ -32,11 +33,15 @@ async def lifespan(app: FastAPI):
     log.info("GEKKO starting up...")
     asyncio.create_task(auth.auto_login_loop())      # handles daily token
     asyncio.create_task(feed.ticker_loop())          # live prices via KiteTicker
-    asyncio.create_task(strategy_monitor_loop())     # checks strategies every second
+    asyncio.create_task(strategy_monitor_loop())     # runs strategies on ticks / order updates
+    asyncio.create_task(minutely_loop())             # once-a-minute status logs
     asyncio.create_task(broadcast_loop())            # pushes data to all WS clients
+    asyncio.create_task(order_mgr.keep_warm_loop())  # warm HTTPS connection for orders
     yield
     log.info("GEKKO shutting down...")
     await feed.stop()
+    await order_mgr.close()
+    state._io.shutdown(wait=False)
 
 app = FastAPI(title="GEKKO API", lifespan=lifespan)
 
@@ -47,6 +52,11 @@ app.add_middleware(CORSMiddleware,
 )
 
 # ── WebSocket connection manager ──────────────────────────────
+def encode(data: dict) -> str:
+    """orjson-encode a WS message as a text frame, as send_json would send.
+    State payloads must go through here: log entries are pre-encoded orjson.Fragments"""
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
 class ConnectionManager:
     def __init__(self):
         self.active: list[WebSocket] = []
@@ -60,22 +70,40 @@ class ConnectionManager:
         self.active.remove(ws)
 
     async def broadcast(self, data: dict):
-        dead = []
-        for ws in self.active:
-            try:
-                await ws.send_json(data)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self.active.remove(ws)
+        # Encode once for every client
+        payload = encode(data)
+        # Push to all sockets concurrently so one slow client doesn't delay the rest
+        clients = list(self.active)
+        results = await asyncio.gather(*(ws.send_text(payload) for ws in clients),
+                                       return_exceptions=True)
+        for ws, res in zip(clients, results):
+            if isinstance(res, Exception) and ws in self.active:
+                self.active.remove(ws)
 
 mgr = ConnectionManager()
 
+FULL_SNAPSHOT_EVERY = 30   # seconds; deltas are sent in between
+IDLE_HEARTBEAT      = 30   # seconds; max wait for a tick outside market hours
+STRATEGY_MIN_INTERVAL = 0.2  # seconds; floor between strategy ticks under bursty data
+
+async def wait_for_market(seen: int) -> int:
+    """
+    Pace a background loop: at most once a second, and only once a tick has
+    arrived — with a 1s heartbeat in market hours, IDLE_HEARTBEAT outside.
+    """
+    await asyncio.sleep(1)
+    return await state.wait_tick(seen, 1.0 if state.is_market_hours() else IDLE_HEARTBEAT)
+
 # ── Background loops ──────────────────────────────────────────
 async def strategy_monitor_loop():
-    """Runs active strategy logic every second during market hours"""
+    """
+    Runs active strategy logic during market hours as soon as a tick or order
+    update arrives, with a 1s watchdog when the feed is quiet.
+    """
+    seen = 0
     while True:
-        await asyncio.sleep(1)
+        await asyncio.sleep(STRATEGY_MIN_INTERVAL)
+        seen = await state.wait_tick(seen, 1.0 if state.is_market_hours() else IDLE_HEARTBEAT)
         if not state.is_market_hours() or not state.kite:
             continue
         try:
@@ -86,15 +114,43 @@ async def strategy_monitor_loop():
         except Exception as e:
             log.error(f"Strategy tick error: {e}")
 
+async def minutely_loop():
+    """Periodic status lines, kept off the strategy tick path"""
+    while True:
+        await asyncio.sleep(60)
+        if state.is_market_hours() and state.kite and state.active_strategy == "B":
+            strat_b.log_waiting()
+
 async def broadcast_loop():
-    """Pushes snapshot to all connected UI clients every second"""
+    """
+    Pushes changes to all connected UI clients every second: a delta with
+    only what moved, and a full snapshot every FULL_SNAPSHOT_EVERY seconds
+    or after the chain is replaced.
+    """
+    last_full    = 0.0
+    last_version = -1
+    last_epoch   = -1
+    seen         = 0
     while True:
-        await asyncio.sleep(1)
-        if not mgr.active:
-            continue
+        seen = await wait_for_market(seen)
         try:
-            snapshot = state.snapshot()
-            await mgr.broadcast({"type": "snapshot", "data": snapshot})
+            # Greeks are only refreshed here, once a second, not on every tick
+            feed.flush_greeks()
+            if not mgr.active:
+                # Keep the delta cursor current so a client connecting later
+                # does not get a backlog of stale log lines
+                state.skip_delta()
+                continue
+            delta = state.delta()
+            now   = time.monotonic()
+            # A replaced chain has new tokens and drops old ones; merges can't express that
+            if now - last_full >= FULL_SNAPSHOT_EVERY or state.chain_epoch != last_epoch:
+                last_full  = now
+                last_epoch = state.chain_epoch
+                await mgr.broadcast({"type": "snapshot", "data": state.snapshot()})
+            elif delta["v"] != last_version or delta["log"]:
+                await mgr.broadcast({"type": "delta", "data": delta})
+            last_version = delta["v"]
         except Exception as e:
             log.error(f"Broadcast error: {e}")
 
@@ -150,14 +206,16 @@ async def get_positions():
 @app.get("/chain")
 async def get_chain():
     """Live option chain with Greeks"""
-    return {"chain": state.option_chain, "spot": state.spot, "vix": state.vix}
+    chain = sorted(state.option_chain, key=lambda o: o["iv_mismatch"], reverse=True)
+    return {"chain": [rounded_option(o) for o in chain],
+            "spot": state.spot, "vix": state.vix}
 
 # ── WebSocket endpoint ────────────────────────────────────────
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
     await mgr.connect(ws)
     # Send initial state immediately on connect
-    await ws.send_json({"type": "snapshot", "data": state.snapshot()})
+    await ws.send_text(encode({"type": "snapshot", "data": state.snapshot()}))
     try:
         while True:
             msg = await ws.receive_json()
@@ -171,7 +229,7 @@ async def handle_ws_message(msg: dict, ws: WebSocket):
     if cmd == "start_strategy":
         name = msg.get("strategy", "A")
         if not state.kite:
-            await ws.send_json({"type": "error", "msg": "Not authenticated. Login first."})
+            await ws.send_text(encode({"type": "error", "msg": "Not authenticated. Login first."}))
             return
         state.active_strategy = name
         state.add_log("GEKKO", f"Strategy {name} activated by user.", "info")
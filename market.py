@@ -2,8 +2,9 @@
 market.py — Live market data via KiteTicker WebSocket
 Streams real-time LTP, OI, volume for Nifty spot + option chain
 """
-import asyncio, logging, datetime
+import asyncio, logging, random, threading
 from kiteconnect import KiteTicker
+from greeks import BSGreeks, time_to_expiry
 
 log = logging.getLogger("GEKKO.market")
 
@@ -11,15 +12,27 @@ log = logging.getLogger("GEKKO.market")
 NIFTY_SPOT_TOKEN = 256265
 INDIA_VIX_TOKEN  = 264969
 
+# Ticker start retry backoff: full jitter, sleep ~ U(0, min(cap, base * 2**(failures-1)))
+TICKER_RETRY_BASE = 10.0
+TICKER_RETRY_CAP  = 300.0
+
 class MarketFeed:
-    def __init__(self, state):
+    def __init__(self, state, on_order_update=None):
         self.state = state
+        self._on_order_update = on_order_update   # called on the loop thread
         self.ticker: KiteTicker | None = None
         self._running = False
         self._subscribed_tokens: set[int] = set()
+        self._dirty_tokens: set[int] = set()     # options ticked since last flush_greeks
+        # Ticks are handed from the KiteTicker thread to the asyncio loop,
+        # so all state mutation happens on the loop thread
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tick_q: asyncio.Queue = asyncio.Queue()
+        self._consumer: asyncio.Task | None = None
 
     async def ticker_loop(self):
         """Reconnects KiteTicker whenever auth is ready"""
+        failures = 0
         while True:
             await asyncio.sleep(5)
             if not self.state.kite or self.state.auth_status != "connected":
@@ -28,23 +41,27 @@ class MarketFeed:
                 continue
             try:
                 await self._start_ticker()
+                failures = 0
             except Exception as e:
                 log.error(f"Ticker start error: {e}")
                 self._running = False
-                await asyncio.sleep(10)
+                failures += 1
+                await asyncio.sleep(random.uniform(
+                    0, min(TICKER_RETRY_CAP, TICKER_RETRY_BASE * 2 ** (failures - 1))))
 
     async def _start_ticker(self):
         """Start KiteTicker in a thread (it's synchronous internally)"""
-        import threading
         kite = self.state.kite
         api_key = kite.api_key
         access_token = kite.access_token
 
         self.ticker = KiteTicker(api_key, access_token)
+        self._loop  = asyncio.get_running_loop()
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.create_task(self._consume_ticks())
 
         def on_ticks(ws, ticks):
-            for tick in ticks:
-                self._process_tick(tick)
+            self._loop.call_soon_threadsafe(self._tick_q.put_nowait, ticks)
 
         def on_connect(ws, response):
             log.info("KiteTicker connected")
@@ -67,11 +84,16 @@ class MarketFeed:
         def on_reconnect(ws, attempts_count):
             log.info(f"KiteTicker reconnecting... attempt {attempts_count}")
 
+        def on_order_update(ws, data):
+            if self._on_order_update:
+                self._loop.call_soon_threadsafe(self._on_order_update, data)
+
         self.ticker.on_ticks     = on_ticks
         self.ticker.on_connect   = on_connect
         self.ticker.on_close     = on_close
         self.ticker.on_error     = on_error
         self.ticker.on_reconnect = on_reconnect
+        self.ticker.on_order_update = on_order_update
 
         # Run ticker in background thread (it blocks)
         thread = threading.Thread(target=self.ticker.connect, kwargs={"threaded": True})
@@ -79,6 +101,20 @@ class MarketFeed:
         thread.start()
         log.info("KiteTicker thread started")
 
+    async def _consume_ticks(self):
+        """Apply queued tick frames on the event loop, draining any backlog in one go"""
+        while True:
+            frames = [await self._tick_q.get()]
+            while not self._tick_q.empty():
+                frames.append(self._tick_q.get_nowait())
+            for ticks in frames:
+                for tick in ticks:
+                    try:
+                        self._process_tick(tick)
+                    except Exception as e:
+                        log.error(f"Tick processing error: {e}")
+            self.state.notify_tick()
+
     def _process_tick(self, tick: dict):
         """Handle incoming tick data — update state"""
         token = tick["instrument_token"]
@@ -86,10 +122,12 @@ class MarketFeed:
         if token == NIFTY_SPOT_TOKEN:
             self.state.spot = tick.get("last_price", self.state.spot)
             self.state.spot_ohlc = tick.get("ohlc", {})
+            self.state.mark_changed()
 
         elif token == INDIA_VIX_TOKEN:
             self.state.vix = tick.get("last_price", self.state.vix)
             self._update_iv_rank()
+            self.state.mark_changed()
 
         else:
             # Option tick — update chain
@@ -104,27 +142,32 @@ class MarketFeed:
         )
 
     def _update_option_tick(self, token: int, tick: dict):
-        """Update an option in the chain by its instrument token"""
-        for opt in self.state.option_chain:
-            if opt.get("token") == token:
-                old_ltp = opt.get("ltp", 0)
-                opt["ltp"] = tick.get("last_price", old_ltp)
-                opt["oi"]  = tick.get("oi", opt.get("oi", 0))
-                opt["volume"] = tick.get("volume", opt.get("volume", 0))
-                opt["bid"] = tick.get("depth", {}).get("buy", [{}])[0].get("price", 0)
-                opt["ask"] = tick.get("depth", {}).get("sell", [{}])[0].get("price", 0)
-                # Recalculate Greeks on each tick
-                self._recalc_greeks(opt)
-                break
+        """Update an option in the chain by its instrument token. Greeks wait for flush_greeks"""
+        opt = self.state.option_chain_by_token.get(token)
+        if opt is not None:
+            old_ltp = opt.get("ltp", 0)
+            opt["ltp"] = tick.get("last_price", old_ltp)
+            opt["oi"]  = tick.get("oi", opt.get("oi", 0))
+            opt["volume"] = tick.get("volume", opt.get("volume", 0))
+            depth = tick.get("depth")
+            if depth:
+                buy  = depth.get("buy")
+                sell = depth.get("sell")
+                opt["bid"] = buy[0]["price"] if buy else 0
+                opt["ask"] = sell[0]["price"] if sell else 0
+            self._dirty_tokens.add(token)
+            self.state.mark_changed(token)
 
         # Also update open position LTP
-        for pos in self.state.positions:
-            if pos.get("token") == token:
+        legs = self.state.positions_by_token.get(token)
+        if legs:
+            # Session PnL moves by these legs' change only — no re-sum over all legs
+            for pos in legs:
                 pos["ltp"] = tick.get("last_price", pos.get("ltp", 0))
-                pos["pnl"] = self._calc_position_pnl(pos)
-
-        # Recalc session PnL
-        self.state.session_pnl = sum(p.get("pnl", 0) for p in self.state.positions)
+                new_pnl = self._calc_position_pnl(pos)
+                self.state.session_pnl += new_pnl - pos.get("pnl", 0.0)
+                pos["pnl"] = new_pnl
+            self.state.mark_changed()
 
     def _calc_position_pnl(self, pos: dict) -> float:
         qty    = pos.get("qty", 0)
@@ -134,40 +177,79 @@ class MarketFeed:
         multiplier = 1 if side == "buy" else -1
         return round((ltp - entry) * qty * multiplier, 2)
 
-    def _recalc_greeks(self, opt: dict):
-        """Recalculate IV and Greeks on each price tick"""
+    def flush_greeks(self):
+        """Reprice every option that ticked since the last flush, in one vectorised batch"""
+        self._sync_subscriptions()
+        if not self._dirty_tokens:
+            return
+        dirty, self._dirty_tokens = self._dirty_tokens, set()
+        by_token = self.state.option_chain_by_token
+        opts = [by_token[t] for t in dirty if t in by_token]
+        self._recalc_greeks(opts)
+        self.state.chain_soa.refresh(opts)
+        self.state.chain_version += 1
+
+    def _recalc_greeks(self, opts: list[dict]):
+        """Recalculate IV and Greeks for a batch of ticked options in one vectorised call"""
         try:
-            from greeks import BSGreeks
             S = self.state.spot
-            K = opt["strike"]
-            T = self._time_to_expiry(opt.get("expiry", ""))
             r = 0.065
-            ltp = opt["ltp"]
-            if ltp <= 0 or T <= 0:
+            batch = []
+            for opt in opts:
+                T = time_to_expiry(opt.get("expiry", ""))
+                if opt["ltp"] > 0 and T > 0:
+                    batch.append((opt, T))
+            if not batch or S <= 0:
                 return
-            g = BSGreeks.full_greeks(S, K, T, r, ltp, opt["type"])
-            opt.update(g)
+            g = BSGreeks.full_greeks_vec(
+                S,
+                [opt["strike"] for opt, _ in batch],
+                [T for _, T in batch],
+                r,
+                [opt["ltp"] for opt, _ in batch],
+                [opt["type"] == "CE" for opt, _ in batch],
+            )
             # IV mismatch vs fair (VIX-based)
-            fair_iv = self.state.vix
-            opt["iv_mismatch"] = round(opt["iv"] - fair_iv, 2)
-            opt["overpriced"]  = opt["iv_mismatch"] >= self.state.config.get("iv_mismatch_threshold", 2.0)
+            fair_iv   = self.state.vix
+            threshold = self.state.config.get("iv_mismatch_threshold", 2.0)
+            for i, (opt, _) in enumerate(batch):
+                if g["iv"][i] <= 0:
+                    continue   # no IV fits this price (e.g. a stale print below intrinsic); keep the last Greeks
+                for k, v in g.items():
+                    opt[k] = v[i]
+                opt["iv_mismatch"] = opt["iv"] - fair_iv
+                opt["overpriced"]  = opt["iv_mismatch"] >= threshold
         except Exception:
             pass
 
-    def _time_to_expiry(self, expiry_str: str) -> float:
-        try:
-            exp = datetime.datetime.strptime(expiry_str, "%d%b%y")
-            now = datetime.datetime.now()
-            return max((exp - now).total_seconds() / (365.25 * 24 * 3600), 1/365)
-        except Exception:
-            return 7/365  # default 1 week
+    def _sync_subscriptions(self):
+        """Keep exactly the chain options and open legs on the ticker (index feeds stay)"""
+        wanted = self.state.option_chain_by_token.keys() | self.state.positions_by_token.keys()
+        if not wanted <= self._subscribed_tokens:
+            self.subscribe_option_tokens(list(wanted))
+        stale = self._subscribed_tokens - wanted
+        if stale:
+            if self.ticker and self._running:
+                try:
+                    self.ticker.unsubscribe(list(stale))
+                except Exception as e:
+                    # Still stale on the next flush, so it is retried then
+                    log.warning(f"Unsubscribe error: {e}")
+                    return
+                log.info(f"Unsubscribed from {len(stale)} option tokens")
+            self._subscribed_tokens -= stale
 
     def subscribe_option_tokens(self, tokens: list[int]):
         """Subscribe to additional option tokens on the fly"""
         new_tokens = [t for t in tokens if t not in self._subscribed_tokens]
         if new_tokens and self.ticker and self._running:
-            self.ticker.subscribe(new_tokens)
-            self.ticker.set_mode(self.ticker.MODE_FULL, new_tokens)
+            try:
+                self.ticker.subscribe(new_tokens)
+                self.ticker.set_mode(self.ticker.MODE_FULL, new_tokens)
+            except Exception as e:
+                # Left out of _subscribed_tokens so the next flush retries them
+                log.warning(f"Subscribe error: {e}")
+                return
             self._subscribed_tokens.update(new_tokens)
             log.info(f"Subscribed to {len(new_tokens)} new option tokens")
 
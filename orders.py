@@ -2,18 +2,55 @@
 orders.py — Zerodha order placement and position tracking
 Handles: LIMIT orders, IOC fallback to MARKET, position squareoff
 """
-import asyncio, logging, datetime
-from kiteconnect import KiteConnect
+import asyncio, logging
+from asynckite import AsyncKite
+from state import hhmmss
 
 log = logging.getLogger("GEKKO.orders")
 
+# Max place_order calls in flight; strategy legs are submitted concurrently
+MAX_CONCURRENT_ORDERS = 4
+
+ORDER_TERMINAL = ("COMPLETE", "REJECTED", "CANCELLED")
+
+# Warm-connection ping interval while a session is live; below asynckite.KEEPALIVE_TIMEOUT
+KEEP_WARM_EVERY = 60
+
 class OrderManager:
     def __init__(self, state):
         self.state = state
+        self._order_slots = asyncio.Semaphore(MAX_CONCURRENT_ORDERS)
+        # order_id -> future resolved with the order's terminal update
+        self._pending: dict[str, asyncio.Future] = {}
+        self._early:   dict[str, dict] = {}   # terminal updates nobody was waiting for yet
+        self._closing: set[int] = set()        # id() of legs with a close order in flight
+        self._client: AsyncKite | None = None
 
     @property
-    def kite(self) -> KiteConnect:
-        return self.state.kite
+    def kite(self) -> AsyncKite:
+        """Async client for the current Kite session, rebuilt when the access token changes"""
+        kite = self.state.kite
+        if self._client is None or self._client.access_token != kite.access_token:
+            if self._client is not None:
+                asyncio.get_running_loop().create_task(self._client.close())
+            self._client = AsyncKite(kite.api_key, kite.access_token)
+        return self._client
+
+    async def keep_warm_loop(self):
+        """Hold a warm TLS connection to Kite so the first order skips the handshake"""
+        while True:
+            await asyncio.sleep(KEEP_WARM_EVERY)
+            if (not self.state.kite or self.state.auth_status != "connected"
+                    or not self.state.is_market_hours()):
+                continue
+            try:
+                await self.kite.warmup()
+            except Exception as e:
+                log.warning(f"Kite warmup error: {e}")
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
 
     async def place_order(self,
         symbol: str,
@@ -27,11 +64,15 @@ class OrderManager:
         Place LIMIT order. If not filled in 10s, cancel and retry as MARKET.
         Returns position dict on success, None on failure.
         """
-        txn = self.kite.TRANSACTION_TYPE_BUY if side == "buy" else self.kite.TRANSACTION_TYPE_SELL
+        async with self._order_slots:
+            return await self._place_order(symbol, side, qty, price, token, tag)
 
+    async def _place_order(self, symbol: str, side: str, qty: int, price: float,
+                           token: int | None, tag: str) -> dict | None:
+        txn = self.kite.TRANSACTION_TYPE_BUY if side == "buy" else self.kite.TRANSACTION_TYPE_SELL
         try:
             # Try LIMIT first (better price)
-            order_id = self.kite.place_order(
+            order_id = await self.kite.place_order(
                 variety  = self.kite.VARIETY_REGULAR,
                 exchange = self.kite.EXCHANGE_NFO,
                 tradingsymbol = symbol,
@@ -42,9 +83,8 @@ class OrderManager:
                 product    = self.kite.PRODUCT_MIS,
                 tag        = f"GEKKO_{tag}"
             )
-            log.info(f"LIMIT order placed: {side.upper()} {symbol} @ {price} | id: {order_id}")
-            self.state.add_log("GEKKO",
-                f"ORDER → {side.upper()} {symbol} @ ₹{price} (LIMIT)", "trade")
+            self.state.emit(log, logging.INFO,
+                f"ORDER → {side.upper()} {symbol} @ ₹{price} (LIMIT) | id: {order_id}", "trade")
 
             # Wait up to 10s for fill
             filled_price = await self._wait_for_fill(order_id, timeout=10)
@@ -53,7 +93,7 @@ class OrderManager:
                 # Cancel and go MARKET
                 log.warning(f"LIMIT not filled, cancelling and retrying MARKET: {order_id}")
                 try:
-                    self.kite.cancel_order(self.kite.VARIETY_REGULAR, order_id)
+                    await self.kite.cancel_order(self.kite.VARIETY_REGULAR, order_id)
                 except Exception:
                     pass
                 filled_price = await self._place_market(symbol, txn, qty, tag)
@@ -62,6 +102,11 @@ class OrderManager:
                 self.state.add_log("GEKKO", f"ORDER FAILED: {symbol}", "alert")
                 return None
 
+            if token is None:
+                # Resolved after the fill so the submit never waits on a lookup;
+                # the leg needs its token to receive live ticks
+                token = await self.get_instrument_token(symbol)
+
             pos = {
                 "symbol":   symbol,
                 "token":    token,
@@ -71,22 +116,21 @@ class OrderManager:
                 "ltp":      filled_price,
                 "pnl":      0.0,
                 "order_id": order_id,
-                "time":     datetime.datetime.now().strftime("%H:%M:%S"),
+                "time":     hhmmss(),
             }
-            self.state.positions.append(pos)
+            self.state.add_position(pos)
             self.state.add_log("GEKKO",
                 f"FILLED: {side.upper()} {symbol} @ ₹{filled_price:.2f}", "trade")
             return pos
 
         except Exception as e:
-            log.error(f"Order placement error: {e}")
-            self.state.add_log("GEKKO", f"Order error: {e}", "alert")
+            self.state.emit(log, logging.ERROR, f"Order error: {e}", "alert")
             return None
 
     async def _place_market(self, symbol: str, txn, qty: int, tag: str) -> float | None:
         """Fallback MARKET order"""
         try:
-            order_id = self.kite.place_order(
+            order_id = await self.kite.place_order(
                 variety  = self.kite.VARIETY_REGULAR,
                 exchange = self.kite.EXCHANGE_NFO,
                 tradingsymbol = symbol,
@@ -103,28 +147,65 @@ class OrderManager:
             return None
 
     async def _wait_for_fill(self, order_id: str, timeout: int = 10) -> float | None:
-        """Poll order book until filled or timeout"""
-        for _ in range(timeout):
-            await asyncio.sleep(1)
+        """
+        Wait for the order's terminal update pushed by KiteTicker.
+        The order book is checked once, only if no update arrives in time.
+        """
+        order_id = str(order_id)
+        fut = asyncio.get_running_loop().create_future()
+        early = self._early.pop(order_id, None)
+        if early is not None:
+            fut.set_result(early)
+        else:
+            self._pending[order_id] = fut
+        try:
+            o = await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            o = None
+        finally:
+            self._pending.pop(order_id, None)
+
+        if o is None:
             try:
-                orders = self.kite.orders()
-                for o in orders:
-                    if str(o["order_id"]) == str(order_id):
-                        if o["status"] == "COMPLETE":
-                            return float(o["average_price"])
-                        if o["status"] in ("REJECTED", "CANCELLED"):
-                            log.warning(f"Order {order_id} {o['status']}: {o.get('status_message')}")
-                            return None
+                o = next((o for o in await self.kite.orders()
+                          if str(o["order_id"]) == str(order_id)), None)
             except Exception as e:
-                log.error(f"Order status poll error: {e}")
+                log.error(f"Order status check error: {e}")
+            if o is None:
+                return None
+
+        if o["status"] == "COMPLETE":
+            return float(o["average_price"])
+        if o["status"] in ("REJECTED", "CANCELLED"):
+            log.warning(f"Order {order_id} {o['status']}: {o.get('status_message')}")
         return None
 
+    def on_order_update(self, data: dict):
+        """KiteTicker order update, dispatched onto the loop thread by MarketFeed"""
+        self.state.notify_tick()   # order events wake the strategy loop too
+        if data.get("status") not in ORDER_TERMINAL:
+            return
+        order_id = str(data.get("order_id"))
+        fut = self._pending.pop(order_id, None)
+        if fut is not None:
+            if not fut.done():
+                fut.set_result(data)
+            return
+        self._early[order_id] = data
+        if len(self._early) > 100:
+            del self._early[next(iter(self._early))]
+
     async def close_position(self, pos: dict):
         """Close a single position"""
+        # Claim the leg before the first await so a concurrent square-off
+        # (strategy exit vs. manual stop) can't send a second close for it
+        if id(pos) in self._closing:
+            return
+        self._closing.add(id(pos))
         close_side = "sell" if pos["side"] == "buy" else "buy"
         txn = self.kite.TRANSACTION_TYPE_SELL if close_side == "sell" else self.kite.TRANSACTION_TYPE_BUY
         try:
-            order_id = self.kite.place_order(
+            order_id = await self.kite.place_order(
                 variety  = self.kite.VARIETY_REGULAR,
                 exchange = self.kite.EXCHANGE_NFO,
                 tradingsymbol = pos["symbol"],
@@ -134,28 +215,27 @@ class OrderManager:
                 product    = self.kite.PRODUCT_MIS,
                 tag        = "GEKKO_CLOSE"
             )
-            log.info(f"Close order: {close_side.upper()} {pos['symbol']} | id: {order_id}")
-            self.state.add_log("GEKKO",
-                f"CLOSE → {close_side.upper()} {pos['symbol']} @ MARKET", "trade")
-            if pos in self.state.positions:
-                self.state.positions.remove(pos)
+            self.state.emit(log, logging.INFO,
+                f"CLOSE → {close_side.upper()} {pos['symbol']} @ MARKET | id: {order_id}", "trade")
+            self.state.remove_position(pos)
         except Exception as e:
             log.error(f"Close position error: {e}")
+        finally:
+            self._closing.discard(id(pos))
 
     async def close_all_positions(self):
         """Square off all open positions"""
         positions = list(self.state.positions)
-        for pos in positions:
-            await self.close_position(pos)
+        await asyncio.gather(*(self.close_position(pos) for pos in positions))
         self.state.add_log("GEKKO", f"All {len(positions)} legs closed.", "trade")
 
-    def get_instrument_token(self, symbol: str, exchange: str = "NFO") -> int | None:
-        """Lookup instrument token for a symbol"""
+    async def get_instrument_token(self, symbol: str) -> int | None:
+        """Lookup NFO instrument token via the shared per-day cache on state"""
+        token = self.state.instrument_token(symbol)
+        if token is not None:
+            return token
         try:
-            instruments = self.kite.instruments(exchange)
-            for inst in instruments:
-                if inst["tradingsymbol"] == symbol:
-                    return inst["instrument_token"]
+            return (await self.state.kite_call(self.state.load_nfo_tokens)).get(symbol)
         except Exception as e:
             log.error(f"Token lookup error: {e}")
         return None
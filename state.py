@@ -2,15 +2,61 @@
 state.py — Shared mutable state for the GEKKO agent
 Single source of truth for all components
 """
-import datetime
+import asyncio, datetime, functools, heapq, itertools, threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
+import orjson
+from chain import ChainSoA
+
+# Decimal places for chain fields in outbound payloads; state keeps full precision
+CHAIN_DECIMALS = {
+    "iv":          2,
+    "delta":       4,
+    "gamma":       5,
+    "theta":       2,
+    "vega":        4,
+    "fair_price":  2,
+    "iv_mismatch": 2,
+}
+
+# Wall-clock stamps for logs/positions, formatted at most once per second / minute
+_HHMMSS = (0, "")
+_HHMM   = (0, "")
+
+def hhmmss() -> str:
+    global _HHMMSS
+    t = int(time.time())
+    if t != _HHMMSS[0]:
+        _HHMMSS = (t, time.strftime("%H:%M:%S", time.localtime(t)))
+    return _HHMMSS[1]
+
+def hhmm() -> str:
+    global _HHMM
+    m = int(time.time()) // 60
+    if m != _HHMM[0]:
+        _HHMM = (m, time.strftime("%H:%M", time.localtime(m * 60)))
+    return _HHMM[1]
+
+def rounded_option(opt: dict) -> dict:
+    """Copy of a chain option with Greeks rounded for the UI"""
+    out = dict(opt)
+    for k, dp in CHAIN_DECIMALS.items():
+        if k in out:
+            out[k] = round(out[k], dp)
+    return out
 
 class AgentState:
     def __init__(self):
         # Auth
         self.kite              = None          # KiteConnect instance
+        self._io               = ThreadPoolExecutor(max_workers=8, thread_name_prefix="kite")
         self.auth_status       = "disconnected"
         self.token_expires     = None
+        # NFO tradingsymbol -> instrument_token, downloaded once per trading day
+        self._nfo_tokens: dict[str, int] = {}
+        self._nfo_tokens_day: datetime.date | None = None
+        self._nfo_lock         = threading.Lock()
 
         # Market data
         self.spot              = 0.0
@@ -18,10 +64,16 @@ class AgentState:
         self.vix               = 0.0
         self.iv_rank           = 0.0
         self.option_chain      = []            # list of option dicts with live Greeks
+        self.option_chain_by_token: dict[int, dict] = {}
+        self.option_chain_by_symbol: dict[str, dict] = {}
+        self.top_overpriced    = []            # 20 highest iv_mismatch options, for the UI
+        self.chain_soa         = ChainSoA.from_options([])   # column view for strategy kernels
 
         # Strategy
         self.active_strategy   = None          # "A" | "B" | None
         self.positions         = []            # open legs
+        self.positions_by_token: dict[int, list[dict]] = {}     # a strike can carry more than one leg
+        self.positions_by_symbol: dict[str, list[dict]] = {}
         self.session_pnl       = 0.0
         self.roll_count        = 0
 
@@ -46,51 +98,221 @@ class AgentState:
             "vix_52w_high":            35.0,
         }
 
+        self._config_listeners: list = []
+        self._derive_config()
+        self._market_open = (-1, False)          # (minute bucket, is_market_hours)
+
         # Log
-        self._log              = []
+        # Last 200 messages, each pre-encoded once as an orjson.Fragment
+        self._log: deque[orjson.Fragment] = deque(maxlen=200)
+        self._log_seq          = 0             # total messages ever logged
+
+        # Tick wake-up: MarketFeed calls notify_tick(), loops await wait_tick()
+        self.tick_event        = asyncio.Event()
+        self._tick_seq         = 0
+
+        # Bumped whenever a chain option's price or Greeks change; monitors skip when unchanged
+        self.chain_version     = 0
+
+        # Change tracking for delta broadcasts
+        self._version          = 0
+        self._changed_tokens: set[int] = set()
+        self._log_seq_sent     = 0
+        self.chain_epoch       = 0             # bumped per set_option_chain; clients then need a full snapshot
+        self._snapshot_buf: dict = {}          # reused by snapshot(); serialised before the next call
 
     # ── Helpers ──────────────────────────────────────────────
     def add_log(self, sender: str, text: str, type_: str = "info"):
-        now = datetime.datetime.now()
-        self._log.append({
+        self._log.append(orjson.Fragment(orjson.dumps({
             "sender": sender,
             "text":   text,
             "type":   type_,
-            "time":   now.strftime("%H:%M"),
-        })
-        # Keep last 200 messages
-        if len(self._log) > 200:
-            self._log = self._log[-200:]
+            "time":   hhmm(),
+        })))
+        self._log_seq += 1
+
+    def emit(self, logger, level: int, text: str, type_: str = "info"):
+        """Send one pre-formatted message to both the server log and the UI log"""
+        if logger.isEnabledFor(level):
+            logger.log(level, text)
+        self.add_log("GEKKO", text, type_)
+
+    async def kite_call(self, fn, *args, **kwargs):
+        """Run a blocking Kite SDK call on the I/O pool so the event loop keeps turning"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._io, functools.partial(fn, *args, **kwargs))
+
+    def load_nfo_tokens(self) -> dict[str, int]:
+        """
+        Blocking — run on the I/O pool. Today's NFO symbol -> token map; the
+        instrument dump is downloaded by whichever caller first needs it each day.
+        """
+        with self._nfo_lock:
+            today = datetime.date.today()
+            if self._nfo_tokens_day != today:
+                rows = self.kite.instruments("NFO")
+                self._nfo_tokens = {r["tradingsymbol"]: r["instrument_token"] for r in rows}
+                self._nfo_tokens_day = today
+            return self._nfo_tokens
+
+    def instrument_token(self, symbol: str) -> int | None:
+        """Non-blocking token lookup: live chain first, then the cached NFO map"""
+        opt = self.option_chain_by_symbol.get(symbol)
+        if opt is not None and opt.get("token") is not None:
+            return opt["token"]
+        return self._nfo_tokens.get(symbol)
+
+    def _recent_logs(self, n: int) -> list:
+        """Last n log messages, oldest first"""
+        return list(itertools.islice(self._log, max(0, len(self._log) - n), None))
+
+    def notify_tick(self):
+        """Wake every loop blocked in wait_tick(). Each call gets a fresh Event,
+        so no waiter has to clear() it out from under another"""
+        self._tick_seq += 1
+        self.tick_event.set()
+        self.tick_event = asyncio.Event()
+
+    async def wait_tick(self, seen: int, timeout: float | None) -> int:
+        """Wait for a tick newer than `seen` (or timeout); returns the latest tick seq"""
+        if self._tick_seq == seen:
+            try:
+                await asyncio.wait_for(self.tick_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._tick_seq
+
+    def mark_changed(self, token: int | None = None):
+        """Record a tick-driven mutation; token marks a chain option for the next delta"""
+        self._version += 1
+        if token is not None:
+            self._changed_tokens.add(token)
+            self.chain_version += 1
+
+    def set_option_chain(self, chain: list):
+        """Replace the option chain, rebuild its indexes, column view and the UI top-20"""
+        self.option_chain = chain
+        self.option_chain_by_token = {o["token"]: o for o in chain if o.get("token") is not None}
+        self.option_chain_by_symbol = {o["symbol"]: o for o in chain}
+        self.top_overpriced = heapq.nlargest(20, chain, key=lambda o: o["iv_mismatch"])
+        self.chain_soa = ChainSoA.from_options(chain)
+        self.chain_version += 1
+        self.chain_epoch += 1
+        self._changed_tokens.update(self.option_chain_by_token)
+        self.mark_changed()
+
+    # session_pnl is kept equal to the sum of open legs' pnl incrementally:
+    # ticks apply the per-leg change, add/remove apply the whole leg.
+    def add_position(self, pos: dict):
+        self.positions.append(pos)
+        self.session_pnl += pos.get("pnl", 0.0)
+        if pos.get("token") is not None:
+            self.positions_by_token.setdefault(pos["token"], []).append(pos)
+        self.positions_by_symbol.setdefault(pos["symbol"], []).append(pos)
+        self.mark_changed()
+
+    def remove_position(self, pos: dict):
+        # By identity: two legs can hold equal fields (same strike, side, fill)
+        i = next((i for i, p in enumerate(self.positions) if p is pos), None)
+        if i is not None:
+            del self.positions[i]
+            self.session_pnl -= pos.get("pnl", 0.0)
+        self._unindex(self.positions_by_token, pos.get("token"), pos)
+        self._unindex(self.positions_by_symbol, pos.get("symbol"), pos)
+        self.mark_changed()
+
+    @staticmethod
+    def _unindex(index: dict, key, pos: dict):
+        legs = index.get(key)
+        if legs is None:
+            return
+        legs[:] = [p for p in legs if p is not pos]
+        if not legs:
+            del index[key]
+
+    def find_position(self, symbol: str, side: str | None = None) -> dict | None:
+        """First open leg on symbol, optionally restricted to side ("buy" | "sell")"""
+        for pos in self.positions_by_symbol.get(symbol, ()):
+            if side is None or pos.get("side") == side:
+                return pos
+        return None
+
+    def set_config(self, key: str, value):
+        """Update one config value, keeping derived amounts and listeners in sync"""
+        self.config[key] = value
+        self._derive_config()
+        for cb in self._config_listeners:
+            cb()
+
+    def on_config_change(self, cb):
+        """Register cb() to run after every set_config()"""
+        self._config_listeners.append(cb)
+
+    def _derive_config(self):
+        cap = self.config["capital"]
+        self._target_amt = cap * self.config["target_pct"]
+        self._sl_amt     = cap * self.config["sl_pct"]
 
     def is_market_hours(self) -> bool:
-        now = datetime.datetime.now().time()
-        return datetime.time(9, 30) <= now <= datetime.time(15, 15)
+        """Evaluated once per minute; the window edges fall on whole minutes"""
+        bucket = int(time.time() // 60)
+        if self._market_open[0] != bucket:
+            now = datetime.datetime.now().time()
+            self._market_open = (bucket, datetime.time(9, 30) <= now <= datetime.time(15, 15))
+        return self._market_open[1]
 
     def target_hit(self) -> bool:
-        cap = self.config["capital"]
-        return self.session_pnl >= cap * self.config["target_pct"]
+        return self.session_pnl >= self._target_amt
 
     def sl_hit(self) -> bool:
+        return self.session_pnl <= -self._sl_amt
+
+    def _live_fields(self, out: dict) -> dict:
+        """Fill the fields that move with ticks — shared by snapshot() and delta()"""
         cap = self.config["capital"]
-        return self.session_pnl <= -(cap * self.config["sl_pct"])
+        out["auth"]            = self.auth_status
+        out["spot"]            = self.spot
+        out["vix"]             = round(self.vix, 2)
+        out["iv_rank"]         = self.iv_rank
+        out["session_pnl"]     = round(self.session_pnl, 2)
+        out["pnl_pct"]         = round(self.session_pnl / cap * 100, 3) if cap else 0
+        out["active_strategy"] = self.active_strategy
+        out["positions"]       = self.positions
+        out["roll_count"]      = self.roll_count
+        out["is_market"]       = self.is_market_hours()
+        return out
 
     def snapshot(self) -> dict:
-        """Full state snapshot sent to UI via WebSocket every second"""
-        cap = self.config["capital"]
-        return {
-            "auth":          self.auth_status,
-            "spot":          self.spot,
-            "vix":           round(self.vix, 2),
-            "iv_rank":       self.iv_rank,
-            "session_pnl":   round(self.session_pnl, 2),
-            "pnl_pct":       round(self.session_pnl / cap * 100, 3) if cap else 0,
-            "target":        round(cap * self.config["target_pct"], 0),
-            "sl":            round(cap * self.config["sl_pct"], 0),
-            "active_strategy": self.active_strategy,
-            "positions":     self.positions,
-            "option_chain":  self.option_chain[:20],  # top 20 strikes
-            "log":           self._log[-50:],          # last 50 messages
-            "roll_count":    self.roll_count,
-            "is_market":     self.is_market_hours(),
-            "config":        self.config,
-        }
+        """
+        Full state snapshot sent to UI on connect and periodically between deltas.
+        Returns the same dict each call, updated in place — serialise it before
+        the next snapshot().
+        """
+        buf = self._live_fields(self._snapshot_buf)
+        buf["v"]            = self._version
+        buf["target"]       = round(self._target_amt, 0)
+        buf["sl"]           = round(self._sl_amt, 0)
+        buf["option_chain"] = [rounded_option(o) for o in self.top_overpriced]
+        buf["log"]          = self._recent_logs(50)
+        buf["config"]       = self.config
+        return buf
+
+    def delta(self) -> dict:
+        """
+        Changes since the previous delta(): live fields, only the chain
+        options that ticked (merge by token) and only new log messages.
+        """
+        changed, self._changed_tokens = self._changed_tokens, set()
+        new_logs = min(self._log_seq - self._log_seq_sent, 50)
+        self._log_seq_sent = self._log_seq
+        by_token = self.option_chain_by_token
+        out = self._live_fields({})
+        out["v"]       = self._version
+        out["changes"] = [rounded_option(by_token[t]) for t in changed if t in by_token]
+        out["log"]     = self._recent_logs(new_logs)
+        return out
+
+    def skip_delta(self):
+        """Drop pending changes without building a delta (no client to send it to)"""
+        self._changed_tokens.clear()
+        self._log_seq_sent = self._log_seq
@@ -1,40 +1,99 @@
 """
 strategies.py — Strategy A (IV Credit Spread) + Strategy B (Iron Condor)
-Called every second by the monitor loop in main.py
+Called on market ticks (1s watchdog) by the monitor loop in main.py
 """
-import asyncio, logging, datetime
-from greeks import BSGreeks
+import asyncio, logging, datetime, functools, sys, time
+import numpy as np
+from greeks import BSGreeks, time_to_expiry
+from chain import find_condor_shorts, find_most_overpriced
 
 log = logging.getLogger("GEKKO.strategy")
 
+CHAIN_REFRESH_SECS = 60   # re-quote and re-centre the strike strip
+
+@functools.lru_cache(maxsize=4)
+def _expiry_for_date(today_ordinal: int) -> str:
+    """Nearest Thursday expiry strictly after the given day"""
+    today = datetime.date.fromordinal(today_ordinal)
+    days  = (3 - today.weekday()) % 7
+    if days == 0:
+        days = 7
+    exp   = today + datetime.timedelta(days=days)
+    return exp.strftime("%d%b%y").upper()
+
 class OptionScanner:
-    """Scans live option chain and returns sorted mismatch candidates"""
+    """Scans live option chain and returns mismatch candidates"""
 
     def __init__(self, state):
         self.state = state
+        # hedge_pts() value and the epoch time its hour ends
+        self._hedge_pts       = 0
+        self._hedge_pts_until = 0.0
+        # (strike, type) -> interned symbol and symbol -> interned "NFO:" quote key,
+        # for the current expiry only
+        self._sym_table:  dict[tuple[int, str], str] = {}
+        self._quote_keys: dict[str, str] = {}
+        self._sym_expiry: str | None = None
+        self._next_scan = 0.0                  # monotonic time the next refresh is due
+        state.on_config_change(self._on_config_change)
+
+    def symbol(self, expiry: str, strike: int, opt_type: str) -> str:
+        """Tradingsymbol for a NIFTY option, built once per expiry and interned"""
+        if expiry != self._sym_expiry:
+            self._sym_table.clear()
+            self._quote_keys.clear()
+            self._sym_expiry = expiry
+        sym = self._sym_table.get((strike, opt_type))
+        if sym is None:
+            sym = self._sym_table[(strike, opt_type)] = sys.intern(
+                f"NIFTY{expiry}{strike}{opt_type}")
+        return sym
+
+    def quote_key(self, symbol: str) -> str:
+        """Interned kite.quote key ("NFO:<symbol>") for a symbol"""
+        key = self._quote_keys.get(symbol)
+        if key is None:
+            key = self._quote_keys[symbol] = sys.intern(f"NFO:{symbol}")
+        return key
+
+    def refresh_due(self) -> bool:
+        """True at most once every CHAIN_REFRESH_SECS; the caller then refreshes the chain"""
+        now = time.monotonic()
+        if now < self._next_scan:
+            return False
+        self._next_scan = now + CHAIN_REFRESH_SECS
+        return True
+
+    def _on_config_change(self):
+        self._hedge_pts_until = 0.0
 
     def get_expiry(self) -> str:
         """Nearest Thursday expiry"""
-        today = datetime.date.today()
-        days  = (3 - today.weekday()) % 7
-        if days == 0:
-            days = 7
-        exp   = today + datetime.timedelta(days=days)
-        return exp.strftime("%d%b%y").upper()
+        return _expiry_for_date(datetime.date.today().toordinal())
 
     def time_to_expiry(self, expiry_str: str) -> float:
+        return time_to_expiry(expiry_str)
+
+    async def refresh_chain(self) -> list:
+        """
+        Fetch the chain on the Kite I/O pool, then install it into state here,
+        on the loop thread, where ticks, flush_greeks and delta() also run.
+        A failed scan is logged and leaves the current chain in place, so the
+        caller's exit checks still run.
+        """
         try:
-            exp = datetime.datetime.strptime(expiry_str, "%d%b%y")
-            now = datetime.datetime.now()
-            return max((exp - now).total_seconds() / (365.25 * 24 * 3600), 1/365)
-        except Exception:
-            return 7/365
+            chain = await self.state.kite_call(self.fetch_chain)
+        except Exception as e:
+            log.error(f"Chain refresh error: {e}")
+            return self.state.option_chain
+        self.state.set_option_chain(chain)
+        return chain
 
-    def fetch_and_update_chain(self) -> list:
+    def fetch_chain(self) -> list:
         """
-        Pull fresh option chain from Zerodha quote API.
-        Updates state.option_chain with live Greeks.
-        Returns list sorted by IV mismatch (most overpriced first).
+        Pull fresh option chain from Zerodha quote API, with live Greeks.
+        Runs on a worker thread: leaves the chain for refresh_chain() to install.
+        Returns the chain unsorted; set_option_chain builds the UI's top 20.
         """
         kite    = self.state.kite
         spot    = self.state.spot
@@ -47,52 +106,61 @@ class OptionScanner:
         strikes = [atm + i * step for i in range(-8, 9)]  # 16 strikes around ATM
 
         threshold = self.state.config.get("iv_mismatch_threshold", 2.0)
+        tokens    = self.state.load_nfo_tokens()
         chain     = []
 
-        for strike in strikes:
-            for opt_type in ("CE", "PE"):
-                symbol = f"NIFTY{expiry}{strike}{opt_type}"
-                try:
-                    q   = kite.quote([f"NFO:{symbol}"])[f"NFO:{symbol}"]
-                    ltp = q.get("last_price", 0)
-                    oi  = q.get("oi", 0)
-                    if ltp < 3:
-                        continue
-
-                    greeks = BSGreeks.full_greeks(spot, strike, T, r, ltp, opt_type)
-                    iv_mismatch = round(greeks["iv"] - vix, 2)
-
-                    inst = kite.instruments("NFO")
-                    token = next(
-                        (i["instrument_token"] for i in inst if i["tradingsymbol"] == symbol),
-                        None
-                    )
-
-                    chain.append({
-                        "symbol":      symbol,
-                        "token":       token,
-                        "strike":      strike,
-                        "type":        opt_type,
-                        "expiry":      expiry,
-                        "ltp":         ltp,
-                        "oi":          oi,
-                        "iv_mismatch": iv_mismatch,
-                        "overpriced":  iv_mismatch >= threshold,
-                        **greeks
-                    })
-                except Exception:
-                    pass
-
-        # Sort: most overpriced first
-        chain.sort(key=lambda x: x["iv_mismatch"], reverse=True)
-        self.state.option_chain = chain
+        # One quote call for the whole strip
+        legs   = [(strike, opt_type, self.symbol(expiry, strike, opt_type))
+                  for strike in strikes for opt_type in ("CE", "PE")]
+        quotes = kite.quote([self.quote_key(symbol) for _, _, symbol in legs])
+
+        live = []
+        for strike, opt_type, symbol in legs:
+            q = quotes.get(self.quote_key(symbol))
+            if q and q.get("last_price", 0) >= 3:
+                live.append((strike, opt_type, symbol, q))
+
+        # Greeks for the whole strip in one vectorised call
+        g = BSGreeks.full_greeks_vec(
+            spot,
+            [strike for strike, _, _, _ in live],
+            [T] * len(live),
+            r,
+            [q["last_price"] for _, _, _, q in live],
+            [opt_type == "CE" for _, opt_type, _, _ in live],
+        )
+
+        mismatch   = (np.asarray(g["iv"]) - vix).tolist()
+        overpriced = (np.asarray(mismatch) >= threshold).tolist()
+
+        for i, (strike, opt_type, symbol, q) in enumerate(live):
+            greeks = {k: v[i] for k, v in g.items()}
+            chain.append({
+                "symbol":      symbol,
+                "token":       tokens.get(symbol),
+                "strike":      strike,
+                "type":        opt_type,
+                "expiry":      expiry,
+                "ltp":         q["last_price"],
+                "oi":          q.get("oi", 0),
+                "iv_mismatch": mismatch[i],
+                "overpriced":  overpriced[i],
+                **greeks
+            })
+
         return chain
 
     def hedge_pts(self) -> int:
-        now = datetime.datetime.now().hour
-        return (self.state.config["pre_noon_hedge_pts"]
-                if now < 12 else
-                self.state.config["post_noon_hedge_pts"])
+        """Hedge distance for the current hour; re-evaluated only when the hour ends"""
+        now = time.time()
+        if now >= self._hedge_pts_until:
+            dt = datetime.datetime.now()
+            self._hedge_pts = (self.state.config["pre_noon_hedge_pts"]
+                               if dt.hour < 12 else
+                               self.state.config["post_noon_hedge_pts"])
+            self._hedge_pts_until = now + (3600 - dt.minute * 60 - dt.second
+                                           - dt.microsecond / 1e6)
+        return self._hedge_pts
 
 
 # ─────────────────────────────────────────────────────────────
@@ -111,31 +179,38 @@ class StrategyA:
         self.scanner   = OptionScanner(state)
         self.entered   = False
         self.short_leg = None   # the sold option info
+        self._last_seen = None  # (chain_version, roll_count) at the last monitor pass
         self.hedge_leg = None
-        self._scan_counter = 0
+        self._load_config()
+        state.on_config_change(self._load_config)
+
+    def _load_config(self):
+        """Bind the config values the tick path reads to attributes"""
+        cfg = self.state.config
+        self.thr           = cfg["iv_mismatch_threshold"]
+        self.lot           = cfg["lot_size"]
+        self.decay_trigger = cfg["decay_trigger_pct"]
+        self.adj_delta     = cfg["adjustment_delta"]
+        self.max_rolls     = cfg["max_rolls"]
 
     async def tick(self):
-        """Called every second by monitor loop"""
+        """Called on each tick by monitor loop"""
         # Refresh chain every 60 seconds
-        self._scan_counter += 1
-        if self._scan_counter % 60 == 0:
-            chain = await asyncio.get_event_loop().run_in_executor(
-                None, self.scanner.fetch_and_update_chain)
+        if self.scanner.refresh_due():
+            await self.scanner.refresh_chain()
 
         # Check exits first
         if self.state.target_hit():
-            log.info("[A] Target hit. Closing.")
-            self.state.add_log("GEKKO",
-                f"TARGET HIT ✓ | PnL: +₹{self.state.session_pnl:.0f} | Closing all.", "trade")
+            self.state.emit(log, logging.INFO,
+                f"[A] TARGET HIT ✓ | PnL: +₹{self.state.session_pnl:.0f} | Closing all.", "trade")
             await self.order_mgr.close_all_positions()
             self.state.active_strategy = None
             self._reset()
             return
 
         if self.state.sl_hit():
-            log.info("[A] SL hit. Closing.")
-            self.state.add_log("GEKKO",
-                f"STOP LOSS ✗ | PnL: ₹{self.state.session_pnl:.0f} | Closing all.", "alert")
+            self.state.emit(log, logging.INFO,
+                f"[A] STOP LOSS ✗ | PnL: ₹{self.state.session_pnl:.0f} | Closing all.", "alert")
             await self.order_mgr.close_all_positions()
             self.state.active_strategy = None
             self._reset()
@@ -143,43 +218,37 @@ class StrategyA:
 
         # Enter if no position
         if not self.entered and len(self.state.positions) == 0:
-            chain = self.state.option_chain
-            if not chain:
-                chain = await asyncio.get_event_loop().run_in_executor(
-                    None, self.scanner.fetch_and_update_chain)
-            await self._enter(chain)
+            await self._enter()
             return
 
         # Monitor for 50% decay or delta breach
         if self.entered and self.short_leg:
             await self._monitor_positions()
 
-    async def _enter(self, chain: list):
-        threshold = self.state.config["iv_mismatch_threshold"]
-        # Get most overpriced with decent OI
-        candidates = [
-            o for o in chain
-            if o["iv_mismatch"] >= threshold and o["oi"] > 500_000
-        ]
-        if not candidates:
+    async def _enter(self):
+        # Most overpriced with decent OI
+        soa = self.state.chain_soa
+        i   = find_most_overpriced(soa.iv_mismatch, soa.oi, self.thr, 500_000.0)
+        if i < 0:
             return
+        sell_opt = self.state.option_chain_by_symbol[soa.symbol[i]]
 
-        sell_opt  = candidates[0]
         hedge_pts = self.scanner.hedge_pts()
         hedge_strike = (sell_opt["strike"] + hedge_pts
                         if sell_opt["type"] == "CE"
                         else sell_opt["strike"] - hedge_pts)
         expiry    = sell_opt["expiry"]
-        hedge_sym = f"NIFTY{expiry}{hedge_strike}{sell_opt['type']}"
-        lot_size  = self.state.config["lot_size"]
+        hedge_sym = self.scanner.symbol(expiry, hedge_strike, sell_opt["type"])
+        lot_size  = self.lot
 
         self.state.add_log("GEKKO",
-            f"IV MISMATCH ▲ {sell_opt['symbol']} | IV: {sell_opt['iv']}% vs fair {self.state.vix:.1f}% "
-            f"(+{sell_opt['iv_mismatch']}σ) | Δ {sell_opt['delta']}", "alert")
+            f"IV MISMATCH ▲ {sell_opt['symbol']} | IV: {sell_opt['iv']:.2f}% vs fair {self.state.vix:.1f}% "
+            f"(+{sell_opt['iv_mismatch']:.2f}σ) | Δ {sell_opt['delta']:.2f}", "alert")
 
         # Get hedge LTP
         try:
-            hedge_q   = self.state.kite.quote([f"NFO:{hedge_sym}"])[f"NFO:{hedge_sym}"]
+            key       = self.scanner.quote_key(hedge_sym)
+            hedge_q   = (await self.state.kite_call(self.state.kite.quote, [key]))[key]
             hedge_ltp = hedge_q.get("last_price", 0)
         except Exception:
             hedge_ltp = 5.0
@@ -189,16 +258,18 @@ class StrategyA:
             f"ENTERING: SELL {sell_opt['symbol']} @ {sell_opt['ltp']} | "
             f"BUY {hedge_sym} @ {hedge_ltp} | Net Credit: {net_credit}pts", "trade")
 
-        # Place orders
-        sell_pos = await self.order_mgr.place_order(
-            symbol=sell_opt["symbol"], side="sell",
-            qty=lot_size, price=sell_opt["ltp"],
-            token=sell_opt.get("token"), tag="A_SHORT"
-        )
-        hedge_pos = await self.order_mgr.place_order(
-            symbol=hedge_sym, side="buy",
-            qty=lot_size, price=hedge_ltp,
-            tag="A_HEDGE"
+        # Place both legs concurrently
+        sell_pos, hedge_pos = await asyncio.gather(
+            self.order_mgr.place_order(
+                symbol=sell_opt["symbol"], side="sell",
+                qty=lot_size, price=sell_opt["ltp"],
+                token=sell_opt.get("token"), tag="A_SHORT"
+            ),
+            self.order_mgr.place_order(
+                symbol=hedge_sym, side="buy",
+                qty=lot_size, price=hedge_ltp,
+                tag="A_HEDGE"
+            ),
         )
 
         if sell_pos and hedge_pos:
@@ -210,11 +281,14 @@ class StrategyA:
         """Check 50% decay and delta breach"""
         if not self.short_leg:
             return
+        # Nothing to re-check unless the chain or the roll count moved
+        seen = (self.state.chain_version, self.state.roll_count)
+        if seen == self._last_seen:
+            return
+        self._last_seen = seen
 
         # Find current LTP of short leg from chain
-        current = next(
-            (o for o in self.state.option_chain
-             if o["symbol"] == self.short_leg["symbol"]), None)
+        current = self.state.option_chain_by_symbol.get(self.short_leg["symbol"])
         if not current:
             return
 
@@ -223,7 +297,7 @@ class StrategyA:
         decay_pct     = 1 - (current_ltp / entry_premium) if entry_premium > 0 else 0
 
         # 50% decay exit
-        if decay_pct >= self.state.config["decay_trigger_pct"]:
+        if decay_pct >= self.decay_trigger:
             self.state.add_log("GEKKO",
                 f"50% DECAY TRIGGERED ({decay_pct:.0%}) on {self.short_leg['symbol']}. Exiting.", "trade")
             await self.order_mgr.close_all_positions()
@@ -232,37 +306,37 @@ class StrategyA:
             return
 
         # Delta breach → roll
-        if (abs(current.get("delta", 0)) > self.state.config["adjustment_delta"]
-                and self.state.roll_count < self.state.config["max_rolls"]):
+        if (abs(current.get("delta", 0)) > self.adj_delta
+                and self.state.roll_count < self.max_rolls):
             await self._roll(current)
 
     async def _roll(self, current_opt: dict):
         """Roll short leg 50pts further OTM"""
         self.state.roll_count += 1
         self.state.add_log("GEKKO",
-            f"ROLL {self.state.roll_count}/{self.state.config['max_rolls']} | "
+            f"ROLL {self.state.roll_count}/{self.max_rolls} | "
             f"Delta {current_opt['delta']:.2f} breached. Rolling 50pts.", "alert")
 
         # Close current short leg
-        short_pos = next(
-            (p for p in self.state.positions if p["symbol"] == self.short_leg["symbol"]), None)
+        short_pos = self.state.find_position(self.short_leg["symbol"], "sell")
         if short_pos:
             await self.order_mgr.close_position(short_pos)
 
         # Open new short leg 50pts further
         direction = 1 if current_opt["type"] == "CE" else -1
         new_strike = current_opt["strike"] + (50 * direction)
-        new_symbol = f"NIFTY{current_opt['expiry']}{new_strike}{current_opt['type']}"
+        new_symbol = self.scanner.symbol(current_opt["expiry"], new_strike, current_opt["type"])
 
         try:
-            q   = self.state.kite.quote([f"NFO:{new_symbol}"])[f"NFO:{new_symbol}"]
+            key = self.scanner.quote_key(new_symbol)
+            q   = (await self.state.kite_call(self.state.kite.quote, [key]))[key]
             ltp = q.get("last_price", 0)
         except Exception:
             return
 
         new_pos = await self.order_mgr.place_order(
             symbol=new_symbol, side="sell",
-            qty=self.state.config["lot_size"],
+            qty=self.lot,
             price=ltp, tag="A_ROLL"
         )
         if new_pos:
@@ -292,13 +366,25 @@ class StrategyB:
         self.entered   = False
         self.short_ce  = None
         self.short_pe  = None
-        self._scan_counter = 0
+        self._last_seen = None  # (chain_version, roll_count) at the last monitor pass
+        self._no_strikes_epoch = None  # chain_epoch already reported as having no condor strikes
+        self._load_config()
+        state.on_config_change(self._load_config)
+
+    def _load_config(self):
+        """Bind the config values the tick path reads to attributes"""
+        cfg = self.state.config
+        self.iv_entry  = cfg["iv_rank_entry"]
+        self.dmin      = cfg["delta_short_min"]
+        self.dmax      = cfg["delta_short_max"]
+        self.lot       = cfg["lot_size"]
+        self.wing      = cfg["condor_wing_width"]
+        self.adj_delta = cfg["adjustment_delta"]
+        self.max_rolls = cfg["max_rolls"]
 
     async def tick(self):
-        self._scan_counter += 1
-        if self._scan_counter % 60 == 0:
-            await asyncio.get_event_loop().run_in_executor(
-                None, self.scanner.fetch_and_update_chain)
+        if self.scanner.refresh_due():
+            await self.scanner.refresh_chain()
 
         # Exits
         if self.state.target_hit():
@@ -318,46 +404,46 @@ class StrategyB:
             return
 
         if not self.entered:
-            if self.state.iv_rank >= self.state.config["iv_rank_entry"]:
-                chain = self.state.option_chain or await asyncio.get_event_loop().run_in_executor(
-                    None, self.scanner.fetch_and_update_chain)
-                await self._enter(chain)
-            else:
-                # Log once per minute
-                if self._scan_counter % 60 == 0:
-                    self.state.add_log("GEKKO",
-                        f"Waiting for IV Rank > {self.state.config['iv_rank_entry']}. "
-                        f"Current: {self.state.iv_rank}", "info")
+            if self.state.iv_rank >= self.iv_entry:
+                await self._enter()
             return
 
         await self._monitor()
 
-    async def _enter(self, chain: list):
-        dmin = self.state.config["delta_short_min"]
-        dmax = self.state.config["delta_short_max"]
-        lot  = self.state.config["lot_size"]
-        wing = self.state.config["condor_wing_width"]
-
-        # Find CE short leg
-        ce_cands = [o for o in chain
-                    if o["type"] == "CE" and dmin <= abs(o["delta"]) <= dmax]
-        pe_cands = [o for o in chain
-                    if o["type"] == "PE" and dmin <= abs(o["delta"]) <= dmax]
-
-        if not ce_cands or not pe_cands:
-            self.state.add_log("GEKKO", "Could not find suitable strikes for Iron Condor.", "alert")
+    def log_waiting(self):
+        """Once-a-minute status line while waiting for entry (called from main)"""
+        if not self.entered and self.state.iv_rank < self.iv_entry:
+            self.state.add_log("GEKKO",
+                f"Waiting for IV Rank > {self.iv_entry}. "
+                f"Current: {self.state.iv_rank}", "info")
+
+    async def _enter(self):
+        lot  = self.lot
+        wing = self.wing
+
+        # Short legs: most overpriced CE and PE inside the delta band
+        soa = self.state.chain_soa
+        ce, pe = find_condor_shorts(soa.delta, soa.is_ce, soa.iv_mismatch, self.dmin, self.dmax)
+        if ce < 0 or pe < 0:
+            # Once per scanned chain, not on every tick that retries the entry
+            if self._no_strikes_epoch != self.state.chain_epoch:
+                self._no_strikes_epoch = self.state.chain_epoch
+                self.state.add_log("GEKKO", "Could not find suitable strikes for Iron Condor.", "alert")
             return
 
-        sc  = ce_cands[0]  # short CE
-        sp  = pe_cands[0]  # short PE
+        sc  = self.state.option_chain_by_symbol[soa.symbol[ce]]  # short CE
+        sp  = self.state.option_chain_by_symbol[soa.symbol[pe]]  # short PE
         expiry = sc["expiry"]
 
-        lc_sym = f"NIFTY{expiry}{sc['strike'] + wing}CE"   # long CE
-        lp_sym = f"NIFTY{expiry}{sp['strike'] - wing}PE"   # long PE
+        lc_sym = self.scanner.symbol(expiry, sc["strike"] + wing, "CE")   # long CE
+        lp_sym = self.scanner.symbol(expiry, sp["strike"] - wing, "PE")   # long PE
+        lc_key = self.scanner.quote_key(lc_sym)
+        lp_key = self.scanner.quote_key(lp_sym)
 
         try:
-            lc_ltp = self.state.kite.quote([f"NFO:{lc_sym}"])[f"NFO:{lc_sym}"]["last_price"]
-            lp_ltp = self.state.kite.quote([f"NFO:{lp_sym}"])[f"NFO:{lp_sym}"]["last_price"]
+            q = await self.state.kite_call(self.state.kite.quote, [lc_key, lp_key])
+            lc_ltp = q[lc_key]["last_price"]
+            lp_ltp = q[lp_key]["last_price"]
         except Exception:
             lc_ltp = lp_ltp = 5.0
 
@@ -366,16 +452,17 @@ class StrategyB:
             f"IRON CONDOR | SELL {sc['symbol']}@{sc['ltp']} + {sp['symbol']}@{sp['ltp']} | "
             f"Net credit: {net_credit}pts | IV Rank: {self.state.iv_rank}", "trade")
 
-        # Place all 4 legs
-        for sym, side, ltp, tag in [
+        # Place all 4 legs concurrently
+        legs = [
             (sc["symbol"], "sell", sc["ltp"], "B_SHORT_CE"),
             (lc_sym,       "buy",  lc_ltp,   "B_LONG_CE"),
             (sp["symbol"], "sell", sp["ltp"], "B_SHORT_PE"),
             (lp_sym,       "buy",  lp_ltp,   "B_LONG_PE"),
-        ]:
-            await self.order_mgr.place_order(
-                symbol=sym, side=side, qty=lot, price=ltp, tag=tag)
-            await asyncio.sleep(0.5)  # small delay between legs
+        ]
+        await asyncio.gather(*(
+            self.order_mgr.place_order(symbol=sym, side=side, qty=lot, price=ltp, tag=tag)
+            for sym, side, ltp, tag in legs
+        ), return_exceptions=True)
 
         self.entered  = True
         self.short_ce = sc
@@ -383,41 +470,45 @@ class StrategyB:
 
     async def _monitor(self):
         """Adjust if short leg delta > threshold"""
+        seen = (self.state.chain_version, self.state.roll_count)
+        if seen == self._last_seen:
+            return
+        self._last_seen = seen
         for short, opt_type in [(self.short_ce, "CE"), (self.short_pe, "PE")]:
             if not short:
                 continue
-            current = next(
-                (o for o in self.state.option_chain if o["symbol"] == short["symbol"]), None)
+            current = self.state.option_chain_by_symbol.get(short["symbol"])
             if not current:
                 continue
-            if abs(current.get("delta", 0)) > self.state.config["adjustment_delta"]:
-                if self.state.roll_count < self.state.config["max_rolls"]:
+            if abs(current.get("delta", 0)) > self.adj_delta:
+                if self.state.roll_count < self.max_rolls:
                     await self._adjust_wing(current, opt_type)
 
     async def _adjust_wing(self, current: dict, opt_type: str):
         self.state.roll_count += 1
         self.state.add_log("GEKKO",
-            f"CONDOR ADJUST {self.state.roll_count}/{self.state.config['max_rolls']} | "
+            f"CONDOR ADJUST {self.state.roll_count}/{self.max_rolls} | "
             f"{opt_type} wing delta {current['delta']:.2f}. Moving 50pts.", "alert")
 
         # Close breached short leg
-        pos = next(
-            (p for p in self.state.positions if p["symbol"] == current["symbol"]), None)
+        pos = self.state.find_position(current["symbol"], "sell")
         if pos:
             await self.order_mgr.close_position(pos)
 
         direction  = 1 if opt_type == "CE" else -1
         new_strike = current["strike"] + (50 * direction)
-        new_symbol = f"NIFTY{current['expiry']}{new_strike}{opt_type}"
+        new_symbol = self.scanner.symbol(current["expiry"], new_strike, opt_type)
 
         try:
-            ltp = self.state.kite.quote([f"NFO:{new_symbol}"])[f"NFO:{new_symbol}"]["last_price"]
+            key = self.scanner.quote_key(new_symbol)
+            q   = await self.state.kite_call(self.state.kite.quote, [key])
+            ltp = q[key]["last_price"]
         except Exception:
             return
 
         new_pos = await self.order_mgr.place_order(
             symbol=new_symbol, side="sell",
-            qty=self.state.config["lot_size"],
+            qty=self.lot,
             price=ltp, tag="B_ADJUST"
         )
         if new_pos:
@@ -0,0 +1,70 @@
+"""
+Round-trip checks for the IV solvers: price an option with BSGreeks.price()
+at a known vol, then recover that vol from the price.
+"""
+import math
+from statistics import NormalDist
+import numpy as np
+import pytest
+from greeks import BSGreeks, _iv_nb, _ndtri_upper_nb
+
+S, R = 22000.0, 0.065
+
+# (strike, years to expiry, vol) across deep OTM → deep ITM, 1 day → 3 months
+CASES = [
+    (K, T, v)
+    for K in (19000, 20500, 21500, 21950, 22000, 22050, 22500, 23500, 25000)
+    for T in (1 / 365, 7 / 365, 30 / 365, 90 / 365)
+    for v in (0.08, 0.15, 0.30, 0.60)
+]
+
+def _solvable(K, T, v, opt_type):
+    # Too little time value to pin the vol down in float64
+    p = BSGreeks.price(S, K, T, R, v, opt_type)
+    intrinsic = max((S - K * math.exp(-R * T)) * (1 if opt_type == "CE" else -1), 0.0)
+    return p - intrinsic > 0.05
+
+@pytest.mark.parametrize("opt_type", ["CE", "PE"])
+def test_vec_solver_round_trip(opt_type):
+    cases = [c for c in CASES if _solvable(*c, opt_type)]
+    K, T, v = map(np.array, zip(*cases))
+    prices = [BSGreeks.price(S, k, t, R, s, opt_type) for k, t, s in cases]
+    iv = BSGreeks.implied_volatility_vec(prices, S, K, T, R, [opt_type == "CE"] * len(cases))
+    repriced = [BSGreeks.price(S, k, t, R, s, opt_type) for k, t, s in zip(K, T, iv)]
+    np.testing.assert_allclose(repriced, prices, atol=1e-3)
+    np.testing.assert_allclose(iv, v, atol=5e-4)
+
+@pytest.mark.parametrize("opt_type", ["CE", "PE"])
+def test_scalar_kernel_matches_vec_solver(opt_type):
+    for K, T, v in CASES:
+        if not _solvable(K, T, v, opt_type):
+            continue
+        p = BSGreeks.price(S, K, T, R, v, opt_type)
+        assert _iv_nb(p, S, K, T, R, opt_type == "CE", 1e-5, 8) == pytest.approx(v, abs=5e-4)
+
+@pytest.mark.parametrize("opt_type", ["CE", "PE"])
+def test_kernel_matches_vec_solver_near_intrinsic(opt_type):
+    # Hours to expiry and a hair of time value: the solvability edge
+    theta = 1 if opt_type == "CE" else -1
+    for K in range(20500, 23501, 250):
+        for T in (0.25 / 365, 0.5 / 365, 1 / 365):
+            intrinsic = max(theta * (S - K * math.exp(-R * T)), 0.0)
+            prices = [intrinsic + tv for tv in (1e-4, 1e-3, 4e-3, 1e-2, 0.1, 1.0)]
+            vec = BSGreeks.implied_volatility_vec(prices, S, [K] * len(prices), [T] * len(prices),
+                                                  R, [opt_type == "CE"] * len(prices))
+            for p, v in zip(prices, vec):
+                assert _iv_nb(p, S, K, T, R, opt_type == "CE", 1e-5, 8) == pytest.approx(v, abs=1e-6)
+
+def test_unsolvable_prices_return_zero():
+    # Below intrinsic, and above the underlying itself
+    iv = BSGreeks.implied_volatility_vec([500.0, 30000.0], S, [21000, 21000], [7 / 365] * 2, R,
+                                         [True, True])
+    assert iv.tolist() == [0.0, 0.0]
+    g = BSGreeks.full_greeks(S, 21000, 7 / 365, R, 500.0, "CE")
+    assert all(x == 0.0 for x in g.values())
+
+def test_acklam_inverse_normal():
+    inv = NormalDist().inv_cdf
+    for p in np.linspace(0.5, 0.999999, 400):
+        # Acklam's published bound is 1.15e-9 relative error
+        assert _ndtri_upper_nb(p) == pytest.approx(inv(p), rel=1.2e-9, abs=1e-12)